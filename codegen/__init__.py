@@ -1,10 +1,11 @@
+import compileall
 import json
 import os.path as opath
 import shutil
 
 from codegen.datatypes import build_datatypes_py, write_datatypes_py, append_figure_class
-from codegen.utils import TraceNode, PlotlyNode, LayoutNode
-from codegen.validators import write_validator_py, append_traces_validator_py
+from codegen.utils import TraceNode, PlotlyNode, LayoutNode, remove_stale_packages
+from codegen.validators import write_validators_py, append_traces_validator_py
 
 
 def perform_codegen():
@@ -22,13 +23,13 @@ def perform_codegen():
     extra_layout_nodes = PlotlyNode.get_all_trace_layout_nodes(plotly_schema)
     # Write out validators
     # --------------------
+    # Validator modules are not cleared first: write_validators_py skips
+    # modules that are unchanged since the previous run, and only packages
+    # that are no longer generated are removed
     validators_pkgdir = opath.join(outdir, 'validators')
-    if opath.exists(validators_pkgdir):
-        shutil.rmtree(validators_pkgdir)
-    for node in compound_layout_nodes:
-        write_validator_py(outdir, node, extra_layout_nodes)
-    for node in compound_trace_nodes:
-        write_validator_py(outdir, node)
+    validator_dirs = (write_validators_py(outdir, compound_layout_nodes, extra_layout_nodes) +
+                      write_validators_py(outdir, compound_trace_nodes))
+    remove_stale_packages(validators_pkgdir, validator_dirs)
 
     # Write out datatypes
     # -------------------
@@ -48,6 +49,12 @@ def perform_codegen():
     # -----------------------------
     append_traces_validator_py(validators_pkgdir, base_node)
 
+    # Precompile generated modules
+    # ----------------------------
+    # Byte-compile once here rather than on the first import of each module
+    compileall.compile_dir(validators_pkgdir, quiet=1, workers=0)
+    compileall.compile_dir(datatypes_pkgdir, quiet=1, workers=0)
+
 
 if __name__ == '__main__':
     perform_codegen()
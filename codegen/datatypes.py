@@ -152,6 +152,22 @@ class {compound_node.name_class}({parent_node.base_datatype_class}):\n""")
         buffer.write(f"""
         \"\"\"""")
 
+        # ### Validators ###
+        buffer.write(f"""
+
+    # Validators
+    # ----------
+    @staticmethod
+    def _build_validators():
+        return {{""")
+        for subtype_node in subtype_nodes:
+            buffer.write(f"""
+            '{subtype_node.name_property}': v_{compound_node.name}.{subtype_node.name_validator}(),""")
+
+        buffer.write(f"""
+        }}
+""")
+
         # ### Constructor ###
         buffer.write(f"""
     def __init__(self""")
@@ -162,15 +178,6 @@ class {compound_node.name_class}({parent_node.base_datatype_class}):\n""")
         buffer.write(f"""
         super().__init__('{compound_node.name_property}', **kwargs)
         
-        # Initialize validators
-        # ---------------------""")
-        for subtype_node in subtype_nodes:
-
-            buffer.write(f"""
-        self._validators['{subtype_node.name_property}'] = v_{compound_node.name}.{subtype_node.name_validator}()""")
-
-        buffer.write(f"""
-        
         # Populate data dict with properties
         # ----------------------------------""")
         for subtype_node in subtype_nodes:
@@ -1,5 +1,8 @@
 import importlib
 import inspect
+import os
+import os.path as opath
+import shutil
 import textwrap
 from typing import List, Dict
 
@@ -9,16 +12,89 @@ from yapf.yapflib.yapf_api import FormatCode
 from ipyplotly.basevalidators import BaseValidator, CompoundValidator, CompoundArrayValidator
 
 
-def format_source(validator_source):
-    formatted_source, _ = FormatCode(validator_source,
+def format_source(source):
+    formatted_source, _ = FormatCode(source,
                                      style_config={'based_on_style': 'google',
                                                    'DEDENT_CLOSING_BRACKETS': True,
                                                    'COLUMN_LIMIT': 119})
     return formatted_source
 
 
+def write_source_if_changed(filepath, source) -> bool:
+    """
+    Write source to filepath unless the file already holds identical content
+
+    The source is written to a temporary file that is then moved into place,
+    so an interrupted run never leaves a partially written module behind.
+
+    Returns
+    -------
+    bool
+        True if the file was written
+    """
+    source_bytes = source.encode('utf-8')
+    if opath.exists(filepath):
+        with open(filepath, 'rb') as f:
+            if f.read() == source_bytes:
+                return False
+
+    tmp_filepath = filepath + '.tmp'
+    with open(tmp_filepath, 'wb') as f:
+        f.write(source_bytes)
+    os.replace(tmp_filepath, filepath)
+    return True
+
+
+def remove_stale_packages(pkgdir, package_dirs):
+    """
+    Remove subdirectories of pkgdir that are not in (or above) package_dirs
+
+    Parameters
+    ----------
+    pkgdir: str
+        Root package directory
+    package_dirs: iterable of str
+        Directories of the modules that were generated under pkgdir
+    """
+    pkgdir = opath.normpath(pkgdir)
+    keep_dirs = set()
+    for package_dir in package_dirs:
+        package_dir = opath.normpath(package_dir)
+        while package_dir not in keep_dirs and package_dir != pkgdir:
+            keep_dirs.add(package_dir)
+            package_dir = opath.dirname(package_dir)
+
+    for dirpath, dirnames, _ in os.walk(pkgdir):
+        for dirname in list(dirnames):
+            subdir = opath.join(dirpath, dirname)
+            if dirname != '__pycache__' and subdir not in keep_dirs:
+                shutil.rmtree(subdir)
+                dirnames.remove(dirname)
+
+
 custom_validator_datatypes = {'layout.image.source': 'ImageUri'}
 
+
+class cached_property:
+    """
+    Read-only property that is computed on first access and then stored on
+    the instance.
+
+    PlotlyNode trees are not modified after construction, so the metadata
+    derived from the schema can be computed once per node and reused
+    for the remainder of the codegen run.
+    """
+    def __init__(self, func):
+        self.func = func
+        self.__doc__ = func.__doc__
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        value = instance.__dict__[self.func.__name__] = self.func(instance)
+        return value
+
+
 class PlotlyNode:
 
     # Constructor
@@ -41,6 +117,9 @@ class PlotlyNode:
         # Parent
         self._parent = parent
 
+        # Constructor params docstrings, keyed on (indent, extra_nodes)
+        self._docstring_cache = {}
+
     def __repr__(self):
         return self.dir_str
 
@@ -64,18 +143,18 @@ class PlotlyNode:
     def base_name(self):
         raise NotImplementedError()
 
-    @property
+    @cached_property
     def name(self) -> str:
         if len(self.node_path) == 0:
             return self.base_name
         else:
             return self.node_path[-1]
 
-    @property
+    @cached_property
     def name_pascal_case(self) -> str:
         return self.name.title().replace('_', '')
 
-    @property
+    @cached_property
     def name_undercase(self) -> str:
         if not self.name:
             # Empty name
@@ -91,15 +170,15 @@ class PlotlyNode:
 
         return name2
 
-    @property
+    @cached_property
     def name_property(self) -> str:
         return self.name + ('s' if self.is_array_element else '')
 
-    @property
+    @cached_property
     def name_validator(self) -> str:
         return self.name_pascal_case + ('s' if self.is_array_element else '') + 'Validator'
 
-    @property
+    @cached_property
     def name_base_validator(self) -> str:
         if self.dir_str in custom_validator_datatypes:
             validator_base = f"{custom_validator_datatypes[self.dir_str]}Validator"
@@ -111,6 +190,12 @@ class PlotlyNode:
     def get_constructor_params_docstring(self, indent=12, extra_nodes=[]):
         assert self.is_compound
 
+        # Check docstring cache
+        # ---------------------
+        cache_key = (indent, tuple(extra_nodes))
+        if cache_key in self._docstring_cache:
+            return self._docstring_cache[cache_key]
+
         buffer = StringIO()
 
         subtype_nodes = self.child_datatypes + extra_nodes
@@ -123,7 +208,9 @@ class PlotlyNode:
             buffer.write('\n' + ' ' * indent + subtype_node.name_property)
             buffer.write('\n' + ' ' * (indent + 4) + subtype_description)
 
-        return buffer.getvalue()
+        docstring = buffer.getvalue()
+        self._docstring_cache[cache_key] = docstring
+        return docstring
 
     @property
     def validator_instance(self) -> BaseValidator:
@@ -159,13 +246,13 @@ class PlotlyNode:
 
         return validator_class(**args, **extra_args)
 
-    @property
+    @cached_property
     def name_class(self) -> str:
         return self.name_pascal_case
 
     # Datatypes
     # ---------
-    @property
+    @cached_property
     def datatype(self) -> str:
         if self.is_array_element:
             return 'compound_array'
@@ -176,36 +263,36 @@ class PlotlyNode:
         else:
             return 'literal'
 
-    @property
+    @cached_property
     def datatype_pascal_case(self) -> str:
         return self.datatype.title().replace('_', '')
 
-    @property
+    @cached_property
     def is_compound(self) -> bool:
         return isinstance(self.node_data, dict) and not self.is_simple and self.name != 'impliedEdits'
 
-    @property
+    @cached_property
     def is_literal(self) -> bool:
         return isinstance(self.node_data, str)
 
-    @property
+    @cached_property
     def is_simple(self) -> bool:
         return isinstance(self.node_data, dict) and 'valType' in self.node_data
 
-    @property
+    @cached_property
     def is_array(self) -> bool:
         return isinstance(self.node_data, dict) and \
                self.node_data.get('role', '') == 'object' and \
                'items' in self.node_data
 
-    @property
+    @cached_property
     def is_array_element(self):
         if self.parent and self.parent.parent:
             return self.parent.parent.is_array
         else:
             return False
 
-    @property
+    @cached_property
     def is_datatype(self) -> bool:
         return self.is_simple or self.is_compound
 
@@ -214,7 +301,7 @@ class PlotlyNode:
     def tidy_dir_path(self, p):
         return p
 
-    @property
+    @cached_property
     def dir_path(self) -> List[str]:
         res = [self.base_name] if self.base_name else []
         for i, p in enumerate(self.node_path):
@@ -228,15 +315,15 @@ class PlotlyNode:
 
     # Node path strings
     # -----------------
-    @property
+    @cached_property
     def dir_str(self) -> str:
         return '.'.join(self.dir_path)
 
-    @property
+    @cached_property
     def parent_dir_str(self) -> str:
         return '.'.join(self.dir_path[:-1])
 
-    @property
+    @cached_property
     def pkg_str(self) -> str:
         path_str = ''
         for p in self.dir_path:
@@ -260,7 +347,7 @@ class PlotlyNode:
     def parent(self) -> 'PlotlyNode':
         return self._parent
 
-    @property
+    @cached_property
     def child_datatypes(self) -> List['PlotlyNode']:
         """
         Returns
@@ -280,15 +367,15 @@ class PlotlyNode:
 
         return nodes
 
-    @property
+    @cached_property
     def child_compound_datatypes(self) -> List['PlotlyNode']:
         return [n for n in self.child_datatypes if n.is_compound]
 
-    @property
+    @cached_property
     def child_simple_datatypes(self) -> List['PlotlyNode']:
         return [n for n in self.child_datatypes if n.is_simple]
 
-    @property
+    @cached_property
     def child_literals(self) -> List['PlotlyNode']:
         return [n for n in self.children if n.is_literal]
 
@@ -324,6 +411,29 @@ class PlotlyNode:
 
         return datatype_nodes
 
+    @staticmethod
+    def get_nodes_by_ancestor(nodes: Dict[str, 'PlotlyNode']) -> Dict[str, List['PlotlyNode']]:
+        """
+        Index nodes by the dir_str of each of their ancestors
+
+        Parameters
+        ----------
+        nodes: dict of PlotlyNode
+            Nodes keyed on their dir_str (as returned by get_all_trace_layout_nodes)
+
+        Returns
+        -------
+        dict of list of PlotlyNode
+            Lists of nodes, in their original order, keyed on ancestor dir_str
+        """
+        nodes_by_ancestor = {}
+        for node_name, node in nodes.items():
+            path = node_name.split('.')
+            for i in range(len(path)):
+                nodes_by_ancestor.setdefault('.'.join(path[:i]), []).append(node)
+
+        return nodes_by_ancestor
+
 
 class TraceNode(PlotlyNode):
 
@@ -345,7 +455,7 @@ class TraceNode(PlotlyNode):
 
     # Raw data
     # --------
-    @property
+    @cached_property
     def node_data(self) -> dict:
         if not self.node_path:
             node_data = self.plotly_schema['traces']
@@ -358,7 +468,7 @@ class TraceNode(PlotlyNode):
 
     # Description
     # -----------
-    @property
+    @cached_property
     def description(self) -> str:
         if len(self.node_path) == 0:
             desc = ""
@@ -391,7 +501,7 @@ class LayoutNode(PlotlyNode):
     def base_name(self):
         return ''
 
-    @property
+    @cached_property
     def name(self) -> str:
         if len(self.node_path) == 0:
             return self.base_name
@@ -405,7 +515,7 @@ class LayoutNode(PlotlyNode):
 
     # Description
     # -----------
-    @property
+    @cached_property
     def description(self) -> str:
         desc = self.node_data.get('description', '')
         if isinstance(desc, list):
@@ -414,7 +524,7 @@ class LayoutNode(PlotlyNode):
 
     # Raw data
     # --------
-    @property
+    @cached_property
     def node_data(self) -> dict:
         node_data = self.plotly_schema['layout']
         for prop_name in self.node_path:
@@ -441,7 +551,7 @@ class TraceLayoutNode(LayoutNode):
     def base_name(self):
         return 'layout'
 
-    @property
+    @cached_property
     def name(self) -> str:
         if len(self.node_path) == 0:
             return self.base_name
@@ -450,7 +560,7 @@ class TraceLayoutNode(LayoutNode):
 
     # Raw data
     # --------
-    @property
+    @cached_property
     def node_data(self) -> dict:
         try:
             node_data = (self.plotly_schema['traces']
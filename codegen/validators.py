@@ -1,39 +1,105 @@
 import os
 import os.path as opath
-import shutil
-from io import StringIO
-from typing import Dict
+from typing import Dict, List
 
-from codegen.utils import format_source, PlotlyNode, TraceNode
+from codegen.utils import write_source_if_changed, PlotlyNode, TraceNode
 
 custom_validator_datatypes = {'layout.image.source': 'ImageUri'}
 
+# General schema properties that are not passed to validator constructors.
+# Default is required for the subplotid validator
+excluded_props = frozenset(['valType', 'description', 'role', 'dflt'])
+excluded_subplotid_props = excluded_props - {'dflt'}
+
+# Validator modules are emitted in their final layout (they are not passed
+# through format_source), so long lines are wrapped at this column
+column_limit = 119
+
+
+def wrap_csv(elements: List[str], indent: int) -> str:
+    """
+    Join elements with ', ', starting a new line indented to column indent
+    whenever the current line would exceed column_limit
+
+    Room is left at the end of each line for a separator and a closing
+    bracket
+    """
+    lines = [[]]
+    line_len = indent
+    for element in elements:
+        element_len = len(element) + 2
+        if lines[-1] and line_len + element_len > column_limit:
+            lines.append([])
+            line_len = indent
+        lines[-1].append(element)
+        line_len += element_len
+
+    return (',\n' + ' ' * indent).join(', '.join(line) for line in lines)
+
+
+def build_attr_val_py(val, indent: int) -> str:
+    """
+    Build the source of a validator constructor argument value that starts
+    at column indent
+    """
+    val_repr = repr(val)
+    if isinstance(val, list) and indent + len(val_repr) + 1 > column_limit:
+        return '[' + wrap_csv([repr(v) for v in val], indent + 1) + ']'
+    else:
+        return val_repr
 
-def build_validators_py(parent_node: PlotlyNode,
-                        extra_nodes: Dict[str, 'PlotlyNode'] = {}):
 
-    extra_subtype_nodes = [node for node_name, node in
-                           extra_nodes.items() if
-                           node_name.startswith(parent_node.dir_str)]
+def build_validators_py(parent_node: PlotlyNode,
+                        extra_nodes_by_ancestor: Dict[str, List['PlotlyNode']] = {},
+                        emitted_classes: Dict[tuple, tuple] = None):
+    """
+    Build the source of the validators module for parent_node
+
+    Parameters
+    ----------
+    parent_node: PlotlyNode
+    extra_nodes_by_ancestor: dict of list of PlotlyNode
+        Extra datatype nodes keyed on ancestor dir_str (as returned by
+        PlotlyNode.get_nodes_by_ancestor)
+    emitted_classes: dict of tuple or None
+        Mapping from validator constructor arguments (the base validator
+        class and every argument except the property and parent names) to
+        the (module, class name) that defines them. If specified, validators
+        matching an already defined class are emitted as a subclass of it
+        that only sets the property and parent names, and the classes
+        defined by this module are added to the mapping.
+
+    Returns
+    -------
+    str or None
+    """
+
+    extra_subtype_nodes = extra_nodes_by_ancestor.get(parent_node.dir_str, [])
 
     datatype_nodes = parent_node.child_datatypes + extra_subtype_nodes
 
     if not datatype_nodes:
         return None
 
-    buffer = StringIO()
+    parts = []
+    parts_append = parts.append
 
     # Imports
     # -------
-    buffer.write('import ipyplotly.basevalidators as bv\n')
+    # Modules of reused classes are imported after the base validators
+    import_lines = ['import ipyplotly.basevalidators as bv\n']
+    imported_modules = set()
 
     # Check for colorscale node
     # -------------------------
-    colorscale_node_list = [node for node in datatype_nodes if node.datatype == 'colorscale']
-    if colorscale_node_list:
-        colorscale_path = colorscale_node_list[0].dir_str
-    else:
-        colorscale_path = None
+    colorscale_path = next((node.dir_str for node in datatype_nodes if node.datatype == 'colorscale'), None)
+
+    # Datatypes import prefix
+    # -----------------------
+    datatypes_import = f"""
+        from ipyplotly.datatypes{parent_node.pkg_str} import """
+
+    validators_module = f'ipyplotly.validators{parent_node.pkg_str}'
 
         # Compound datatypes loop
     # -----------------------
@@ -44,108 +110,141 @@ def build_validators_py(parent_node: PlotlyNode,
         # else:
         #     validator_base = f"bv.{datatype_node.datatype_pascal_case}Validator"
 
-        buffer.write(f"""
-        
-class {datatype_node.name_validator}(bv.{datatype_node.name_base_validator}):
-    def __init__(self, prop_name='{datatype_node.name_property}'):""")
+        # Node metadata
+        # -------------
+        name_validator = datatype_node.name_validator
+        name_base_validator = datatype_node.name_base_validator
+        name_property = datatype_node.name_property
+        name_class = datatype_node.name_class
+        parent_dir_str = datatype_node.parent_dir_str
+        datatype = datatype_node.datatype
+        is_array_element = datatype_node.is_array_element
+        is_compound = datatype_node.is_compound
 
         # Add import
-        if datatype_node.is_compound:
-            buffer.write(f"""
-        from ipyplotly.datatypes{parent_node.pkg_str} import {datatype_node.name_pascal_case}""")
-
-        buffer.write(f"""
-        super().__init__(name=prop_name,
-                         parent_name='{datatype_node.parent_dir_str}'""")
-
-        if datatype_node.is_array_element:
-            buffer.write(f""",
-                         element_class={datatype_node.name_class},
-                         element_docs=\"\"\"{datatype_node.get_constructor_params_docstring()}\"\"\"""")
-        elif datatype_node.is_compound:
-            buffer.write(f""",
-                         data_class={datatype_node.name_class},
-                         data_docs=\"\"\"{datatype_node.get_constructor_params_docstring()}\"\"\"""")
+        if is_compound:
+            import_line = datatypes_import + datatype_node.name_pascal_case
+        else:
+            import_line = ''
+
+        # Constructor kwargs
+        if is_array_element:
+            tail = f""",
+                         element_class={name_class},
+                         element_docs=\"\"\"{datatype_node.get_constructor_params_docstring()}\"\"\""""
+        elif is_compound:
+            tail = f""",
+                         data_class={name_class},
+                         data_docs=\"\"\"{datatype_node.get_constructor_params_docstring()}\"\"\""""
         else:
             assert datatype_node.is_simple
 
             # Exclude general properties
-            excluded_props = ['valType', 'description', 'role', 'dflt']
-            if datatype_node.datatype == 'subplotid':
-                # Default is required for subplotid validator
-                excluded_props.remove('dflt')
-
-            attr_nodes = [n for n in datatype_node.simple_attrs
-                          if n.name not in excluded_props]
+            excluded = excluded_subplotid_props if datatype == 'subplotid' else excluded_props
 
-            attr_dict = {node.name_undercase: repr(node.node_data) for node in attr_nodes}
+            attr_dict = {node.name_undercase: node.node_data
+                         for node in datatype_node.simple_attrs
+                         if node.name not in excluded}
 
             # Add special properties
-            if datatype_node.datatype == 'color' and colorscale_path:
-                attr_dict['colorscale_path'] = repr(colorscale_path)
+            if datatype == 'color' and colorscale_path:
+                attr_dict['colorscale_path'] = colorscale_path
+
+            # Arguments are aligned at column 25, after 'super().__init__('
+            tail = ''.join(f""",
+                         {attr_name}={build_attr_val_py(attr_val, 26 + len(attr_name))}"""
+                           for attr_name, attr_val in attr_dict.items())
 
-            for attr_name, attr_val in attr_dict.items():
-                buffer.write(f""",
-                         {attr_name}={attr_val}""")
+        # Reuse class with the same constructor arguments
+        # -----------------------------------------------
+        class_key = (name_base_validator, import_line, tail)
+        if emitted_classes is not None and class_key in emitted_classes:
+            shared_module, shared_name = emitted_classes[class_key]
+            if shared_module == validators_module:
+                shared_base = shared_name
+            else:
+                module_alias = '_v' + shared_module[len('ipyplotly.validators'):].replace('.', '_')
+                if shared_module not in imported_modules:
+                    imported_modules.add(shared_module)
+                    import_lines.append(f'import {shared_module} as {module_alias}\n')
+                shared_base = f'{module_alias}.{shared_name}'
 
-        buffer.write(')')
+            parts_append(f"""
 
-    return buffer.getvalue()
+class {name_validator}({shared_base}):
 
+    def __init__(self, prop_name='{name_property}', parent_name='{parent_dir_str}'):
+        super().__init__(prop_name=prop_name, parent_name=parent_name)
+""")
+            continue
 
-def write_validator_py(outdir,
-                       node: PlotlyNode,
-                       extra_nodes: Dict[str, 'PlotlyNode'] = {}):
+        if emitted_classes is not None:
+            emitted_classes[class_key] = (validators_module, name_validator)
 
-    # Generate source code
-    # --------------------
-    validator_source = build_validators_py(node, extra_nodes)
-    if validator_source:
-        try:
-            formatted_source = format_source(validator_source)
-        except Exception as e:
-            print(validator_source)
-            raise e
+        parts_append(f"""
+
+class {name_validator}(bv.{name_base_validator}):
+
+    def __init__(self, prop_name='{name_property}', parent_name='{parent_dir_str}'):{import_line}
+        super().__init__(name=prop_name,
+                         parent_name=parent_name{tail})
+""")
+
+    return ''.join(import_lines) + ''.join(parts)
+
+
+def write_validators_py(outdir,
+                        nodes: List[PlotlyNode],
+                        extra_nodes: Dict[str, 'PlotlyNode'] = {}) -> List[str]:
+    """
+    Write the validator modules for nodes, skipping unchanged modules
+
+    Returns
+    -------
+    list of str
+        Directories of all validator modules for nodes, whether or not
+        they were rewritten
+    """
+    filedirs = []
+    extra_nodes_by_ancestor = PlotlyNode.get_nodes_by_ancestor(extra_nodes)
+    emitted_classes = {}
+    for node in nodes:
+
+        # Generate source code
+        # --------------------
+        validator_source = build_validators_py(node, extra_nodes_by_ancestor, emitted_classes)
+        if not validator_source:
+            continue
 
         # Write file
         # ----------
         filedir = opath.join(outdir, 'validators', *node.dir_path)
-
-        # ### Create output directory
-        if opath.exists(filedir):
-            shutil.rmtree(filedir)
-        os.makedirs(filedir)
-
-        filepath = opath.join(filedir, '__init__.py')
         os.makedirs(filedir, exist_ok=True)
-        with open(filepath, 'wt') as f:
-            f.write(formatted_source)
+        write_source_if_changed(opath.join(filedir, '__init__.py'), validator_source)
+        filedirs.append(filedir)
+
+    return filedirs
 
 
 def build_traces_validator_py(base_node: TraceNode):
     tracetype_nodes = base_node.child_compound_datatypes
-    buffer = StringIO()
 
-    import_csv = ', '.join([tracetype_node.name_class for tracetype_node in tracetype_nodes])
+    # Imports are aligned at column 41, after 'from ipyplotly.datatypes import ('
+    import_csv = wrap_csv([tracetype_node.name_class for tracetype_node in tracetype_nodes], 41)
+
+    class_map_entries = ''.join([f"""
+            '{tracetype_node.name_property}': {tracetype_node.name_class},"""
+                                 for tracetype_node in tracetype_nodes])
+
+    return f"""
 
-    buffer.write(f"""
 class TracesValidator(bv.BaseTracesValidator):
 
     def __init__(self):
         from ipyplotly.datatypes import ({import_csv})
-        super().__init__(class_map={{
-    """)
-
-    for i, tracetype_node in enumerate(tracetype_nodes):
-        sfx = ',' if i < len(tracetype_nodes) else ''
-
-        buffer.write(f"""
-            '{tracetype_node.name_property}': {tracetype_node.name_class}{sfx}""")
-
-    buffer.write("""
-        })""")
-
-    return buffer.getvalue()
+        super().__init__(class_map={{{class_map_entries}
+        }})
+"""
 
 
 def append_traces_validator_py(outdir, base_node: TraceNode):
@@ -154,12 +253,10 @@ def append_traces_validator_py(outdir, base_node: TraceNode):
         raise ValueError('Expected root trace node. Received node with path "%s"' % base_node.dir_str)
 
     source = build_traces_validator_py(base_node)
-    formatted_source = format_source(source)
 
     # Append to file
     # --------------
     filepath = opath.join(outdir, '__init__.py')
 
     with open(filepath, 'a') as f:
-        f.write('\n\n')
-        f.write(formatted_source)
+        f.write(source)
@@ -1,28 +1,169 @@
-import collections
+import asyncio
+import functools
 import re
+import sys
 import typing as typ
 import uuid
+from types import MappingProxyType
 from contextlib import contextmanager
 from copy import deepcopy
 from pprint import pprint
 import numbers
+import operator
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 from importlib import import_module
+from importlib.util import find_spec
 
 import ipywidgets as widgets
 
 from ipyplotly import animation
-from ipyplotly.basevalidators import CompoundValidator, CompoundArrayValidator
+from ipyplotly.basevalidators import BaseValidator, CompoundValidator, CompoundArrayValidator
 from ipyplotly.serializers import custom_serializers
 from traitlets import List, Unicode, Dict, observe, Integer, Undefined
 
 from ipyplotly.callbacks import Points, BoxSelector, LassoSelector, InputState
 from ipyplotly.validators.layout import XaxisValidator, YaxisValidator, GeoValidator, TernaryValidator, SceneValidator
 
-from plotly.offline import plot as plotlypy_plot
 import os
 import numpy as np
 from urllib import parse
 
+
+# Key path parsing
+# ----------------
+@functools.lru_cache(maxsize=4096)
+def _parse_key_path(raw_key):
+    """
+    Parse a property path string into a tuple of keys
+
+    Results are cached since the same handful of paths (e.g. 'marker.color', 'xaxis.range[1]') are parsed on every
+    restyle / relayout operation.
+
+    Parameters
+    ----------
+    raw_key : str
+        Property path string. e.g. 'foo.bar[0]'
+
+    Returns
+    -------
+    tuple
+        e.g. ('foo', 'bar', 0)
+    """
+    key_path = []
+
+    # Split string on periods. e.g. 'foo.bar[0]' -> ['foo', 'bar[0]']
+    for key in raw_key.split('.'):
+
+        # Split out trailing bracket index. e.g. 'bar[0]' -> 'bar', 0
+        bracket_pos = key.rfind('[')
+        if bracket_pos >= 0 and key.endswith(']') and key[bracket_pos + 1:-1].isdecimal():
+            index = int(key[bracket_pos + 1:-1])
+            key = key[:bracket_pos]
+        else:
+            index = None
+
+        # Convert key to int if possible. e.g. '0' -> 0
+        # Identifiers (e.g. 'marker') can never be parsed as ints, so skip the attempt for those. They are interned
+        # instead, so that looking them up in the validator and props dicts (whose keys are interned literals) is an
+        # identity match
+        if key.isidentifier():
+            key = sys.intern(key)
+        else:
+            try:
+                key = int(key)
+            except ValueError as _:
+                pass
+
+        key_path.append(key)
+        if index is not None:
+            key_path.append(index)
+
+    return tuple(key_path)
+
+
+@functools.lru_cache(maxsize=4096)
+def _key_path_steps(key_path):
+    """
+    Precompute the per-element information needed to walk down to the parent of the final element of a key path
+
+    Parameters
+    ----------
+    key_path : tuple
+        e.g. ('marker', 'colorbar', 'tickvals', 0)
+
+    Returns
+    -------
+    tuple of tuple
+        One (key, key_is_int, child_is_list) tuple for each element of key_path except the last. child_is_list is True
+        if the next key is an int, meaning that a missing child should be initialized as a list rather than a dict
+    """
+    return tuple((key, isinstance(key, int), isinstance(next_key, int))
+                 for key, next_key in zip(key_path[:-1], key_path[1:]))
+
+
+@functools.lru_cache(maxsize=4096)
+def _key_path_splits(key_path):
+    """
+    Precompute the ways of splitting a key path into the path walked so far and the keys left to walk
+
+    Used when building the plan of change callbacks to dispatch, so that the prefix / suffix tuples are not rebuilt for
+    every trace and every message
+
+    Parameters
+    ----------
+    key_path : tuple
+        e.g. ('marker', 'color')
+
+    Returns
+    -------
+    tuple of tuple
+        One (next_key, key_path_so_far, keys_left) tuple for each element of key_path.
+        e.g. (('marker', (), ('marker', 'color')), ('color', ('marker',), ('color',)))
+    """
+    return tuple((key_path[i], key_path[:i], key_path[i:]) for i in range(len(key_path)))
+
+
+# Props cloning
+# -------------
+_immutable_prop_types = frozenset([str, int, float, bool, type(None)])
+
+
+def _clone_props(obj):
+    """
+    Deep copy a JSON-like properties structure
+
+    Specialized replacement for copy.deepcopy that handles the dict / list / tuple / ndarray / scalar values that make
+    up the _props of a plotly object without the generic dispatch and memo bookkeeping of deepcopy. Read-only numpy
+    arrays are shared with the copy. Any other value type falls back to deepcopy.
+
+    Parameters
+    ----------
+    obj
+        Properties structure to copy
+
+    Returns
+    -------
+    Copy of obj
+    """
+    obj_type = type(obj)
+    if obj_type is dict:
+        # Scalar leaves (the bulk of the values in leaf objects like fonts and lines) are copied without a
+        # recursive call
+        return {k: v if type(v) in _immutable_prop_types else _clone_props(v) for k, v in obj.items()}
+    elif obj_type is list:
+        return [v if type(v) in _immutable_prop_types else _clone_props(v) for v in obj]
+    elif obj_type is tuple:
+        return tuple(_clone_props(v) for v in obj)
+    elif obj_type is np.ndarray:
+        # Validated arrays are read-only (see copy_to_contiguous_readonly_numpy_array), so they can be shared rather
+        # than copied. Only arrays that bypassed validation are copied
+        return obj.copy() if obj.flags.writeable else obj
+    elif obj_type in _immutable_prop_types:
+        return obj
+    else:
+        return deepcopy(obj)
+
 @widgets.register
 class BaseFigureWidget(widgets.DOMWidget):
 
@@ -68,6 +209,13 @@ class BaseFigureWidget(widgets.DOMWidget):
     _last_relayout_msg_id = Integer(0).tag(sync=True)
     _last_restyle_msg_id = Integer(0).tag(sync=True)
 
+    # Validators shared by all figures. These are stateless, so they're created on first use rather than per figure
+    _shared_data_validator = None
+    _shared_layout_validator = None
+
+    # Worker threads for converting svg images with cairosvg, shared by all figures. Created on first use
+    _image_executor = None
+
     # Constructor
     # -----------
     def __init__(self, data=None, layout=None):
@@ -75,26 +223,32 @@ class BaseFigureWidget(widgets.DOMWidget):
 
         # Traces
         # ------
-        from ipyplotly.validators import TracesValidator
-        self._data_validator = TracesValidator()
+        if BaseFigureWidget._shared_data_validator is None:
+            from ipyplotly.validators import TracesValidator
+            BaseFigureWidget._shared_data_validator = TracesValidator()
+        self._data_validator = BaseFigureWidget._shared_data_validator
 
         if data is None:
             self._data_objs = ()  # type: typ.Tuple[BaseTraceHierarchyType]
             self._data_defaults = []
+            self._data_obj_inds = {}  # type: typ.Dict[int, int]
         else:
             data = self._data_validator.validate_coerce(data)
 
             self._data_objs = data
+            self._update_data_obj_inds()
             self._data_defaults = [{} for trace in data]
-            self._data = [deepcopy(trace._props) for trace in data]
+            self._data = [_clone_props(trace._props) for trace in data]
             for trace in data:
                 trace._orphan_props.clear()
                 trace._parent = self
 
         # Layout
         # ------
-        from ipyplotly.validators import LayoutValidator
-        self._layout_validator = LayoutValidator()
+        if BaseFigureWidget._shared_layout_validator is None:
+            from ipyplotly.validators import LayoutValidator
+            BaseFigureWidget._shared_layout_validator = LayoutValidator()
+        self._layout_validator = BaseFigureWidget._shared_layout_validator
 
         from ipyplotly.datatypes import Layout
 
@@ -104,7 +258,7 @@ class BaseFigureWidget(widgets.DOMWidget):
             layout = self._layout_validator.validate_coerce(layout)
 
         self._layout_obj = layout
-        self._layout = deepcopy(self._layout_obj._props)
+        self._layout = _clone_props(self._layout_obj._props)
         self._layout_obj._parent = self
         self._layout_defaults = {}
 
@@ -116,6 +270,11 @@ class BaseFigureWidget(widgets.DOMWidget):
         self._restyle_in_process = False
         self._waiting_restyle_callbacks = []
 
+        # Last processed deltas. Every view of the figure responds to a message with its own (usually identical) delta,
+        # so these are used to skip re-processing a delta that has already been applied
+        self._last_style_deltas = None
+        self._last_layout_delta = None
+
         # View count
         # ----------
         self._view_count = 0
@@ -123,7 +282,7 @@ class BaseFigureWidget(widgets.DOMWidget):
         # Context manager
         # ---------------
         self._in_batch_mode = False
-        self._batch_style_commands = {}  # type: typ.Dict[int, typ.Dict[str, typ.Any]]
+        self._batch_style_commands = {}  # type: typ.Dict[typ.Tuple[int, str], typ.Any]
         self._batch_layout_commands = {}  # type: typ.Dict[str, typ.Any]
         self._animation_duration_validator = animation.DurationValidator()
         self._animation_easing_validator = animation.EasingValidator()
@@ -140,6 +299,19 @@ class BaseFigureWidget(widgets.DOMWidget):
         # -------
         self._log_plotly_commands = False
 
+        # Update coalescing
+        # -----------------
+        # See the update_coalesce_interval property
+        self._update_coalesce_interval = 0
+        # Queued (style, layout, style extras). style is keyed by (trace_index, prop) like _batch_style_commands
+        self._pending_update = None  # type: typ.Optional[typ.Tuple[typ.Dict, typ.Dict, typ.Dict]]
+        self._pending_update_handle = None
+
+        # Serialization
+        # -------------
+        # See the float32_arrays property
+        self._float32_arrays = False
+
     # ### Trait methods ###
     @observe('_js2py_styleDelta')
     def handler_plotly_styleDelta(self, change):
@@ -151,7 +323,14 @@ class BaseFigureWidget(widgets.DOMWidget):
 
         msg_id = deltas[0].get('_restyle_msg_id', None)
         # print(f'styleDelta: {msg_id} == {self._last_restyle_msg_id}')
-        if msg_id == self._last_restyle_msg_id:
+        # Skip deltas that have already been applied from another view
+        if msg_id == self._last_restyle_msg_id and not self._deltas_equal(deltas, self._last_style_deltas):
+            self._last_style_deltas = deltas
+
+            # Build uid lookup once per message rather than once per delta. Built here rather than maintained
+            # alongside _data_obj_inds since trace uids may be reassigned by the user
+            trace_uid_inds = {trace.uid: i for i, trace in enumerate(self.data)}
+
             for delta in deltas:
                 trace_uid = delta['uid']
 
@@ -159,8 +338,7 @@ class BaseFigureWidget(widgets.DOMWidget):
                 # pprint(delta)
                 # print('Processing styleDelta')
 
-                trace_uids = [trace.uid for trace in self.data]
-                trace_index = trace_uids.index(trace_uid)
+                trace_index = trace_uid_inds[trace_uid]
                 uid_trace = self.data[trace_index]
                 delta_transform = BaseFigureWidget.transform_data(uid_trace._prop_defaults, delta)
 
@@ -175,9 +353,11 @@ class BaseFigureWidget(widgets.DOMWidget):
                 self._dispatch_change_callbacks_restyle(delta_transform, [trace_index])
 
             self._restyle_in_process = False
-            while self._waiting_restyle_callbacks:
-                # Call callbacks
-                self._waiting_restyle_callbacks.pop()()
+            # Call callbacks in the order they were registered. Swap in a new list first so that callbacks registered
+            # while these run are kept for the next restyle
+            waiting_callbacks, self._waiting_restyle_callbacks = self._waiting_restyle_callbacks, []
+            for callback in waiting_callbacks:
+                callback()
 
     @observe('_js2py_restyle')
     def handler_js2py_restyle(self, change):
@@ -206,6 +386,32 @@ class BaseFigureWidget(widgets.DOMWidget):
 
         self.update(style=style, layout=layout, trace_indexes=trace_indexes)
 
+    # Serialization
+    # -------------
+    @property
+    def float32_arrays(self):
+        """
+        Whether float64 arrays are sent to the front-end as float32
+
+        This halves the size of large numeric arrays sent to the front-end. It is lossy: values are rounded to single
+        precision (about 7 significant digits), which is usually acceptable for rendering but not for data that is
+        read back from the front-end. Only data sent after the option is set is affected. The values stored on the
+        Python side always keep their full precision. Defaults to False
+
+        Returns
+        -------
+        bool
+        """
+        return self._float32_arrays
+
+    @float32_arrays.setter
+    def float32_arrays(self, val):
+        if not isinstance(val, bool):
+            raise ValueError('float32_arrays must be a bool.\n'
+                             '    Received value: {val}'.format(val=repr(val)))
+
+        self._float32_arrays = val
+
     # Magic Methods
     # -------------
     def __setitem__(self, prop, value):
@@ -233,19 +439,32 @@ class BaseFigureWidget(widgets.DOMWidget):
     @data.setter
     def data(self, new_data):
 
+        # Send queued updates first so that messages reach the front-end in order
+        self.flush_updates()
+
         # Validate new_data
         orig_uids = [_trace['uid'] for _trace in self._data]
         new_uids = [trace.uid for trace in new_data]
 
-        invalid_uids = set(new_uids).difference(set(orig_uids))
+        # Check for invalid and duplicate uids in a single pass
+        orig_uids_set = set(orig_uids)
+        new_uids_set = set()
+        invalid_uids = set()
+        duplicate_uids = []
+        for uid in new_uids:
+            if uid not in orig_uids_set:
+                invalid_uids.add(uid)
+
+            if uid not in new_uids_set:
+                new_uids_set.add(uid)
+            elif uid not in duplicate_uids:
+                duplicate_uids.append(uid)
+
         if invalid_uids:
             raise ValueError(('The trace property of a figure may only be assigned to '
                               'a permutation of a subset of itself\n'
                               '    Invalid trace(s) with uid(s): {invalid_uids}').format(invalid_uids=invalid_uids))
 
-        # Check for duplicates
-        uid_counter = collections.Counter(new_uids)
-        duplicate_uids = [uid for uid, count in uid_counter.items() if count > 1]
         if duplicate_uids:
             raise ValueError(('The trace property of a figure may not be assigned '
                               'multiple copies of a trace\n'
@@ -253,34 +472,30 @@ class BaseFigureWidget(widgets.DOMWidget):
                               ).format(duplicate_uids=duplicate_uids))
 
         # Compute traces to remove
-        remove_uids = set(orig_uids).difference(set(new_uids))
+        remove_uids = orig_uids_set.difference(new_uids_set)
         delete_inds = []
         for i, _trace in enumerate(self._data):
             if _trace['uid'] in remove_uids:
                 delete_inds.append(i)
 
-                # Unparent trace object to be removed
+                # Unparent trace object to be removed. The trace's props dict is removed from self._data below, so it's
+                # handed to the trace without a copy
                 old_trace = self.data[i]
-                old_trace._orphan_props.update(deepcopy(self.data[i]._props))
+                old_trace._orphan_props.update(_trace)
                 old_trace._parent = None
 
         # Compute trace data list after removal
-        traces_props_post_removal = [t for t in self._data]
-        traces_prop_defaults_post_removal = [t for t in self._data_defaults]
-        orig_uids_post_removal = [trace_data['uid'] for trace_data in self._data]
-
-        for i in reversed(delete_inds):
-            del traces_props_post_removal[i]
-            del traces_prop_defaults_post_removal[i]
-            del orig_uids_post_removal[i]
+        keep_inds = [i for i, uid in enumerate(orig_uids) if uid not in remove_uids]
+        traces_props_post_removal = [self._data[i] for i in keep_inds]
+        traces_prop_defaults_post_removal = [self._data_defaults[i] for i in keep_inds]
+        orig_uids_post_removal = [orig_uids[i] for i in keep_inds]
 
         if delete_inds:
             relayout_msg_id = self._last_relayout_msg_id + 1
             self._last_relayout_msg_id = relayout_msg_id
             self._relayout_in_process = True
 
-            for di in reversed(delete_inds):
-                del self._data[di]  # Modify in-place so we don't trigger serialization
+            self._data[:] = traces_props_post_removal  # Modify in-place so we don't trigger serialization
 
             if self._log_plotly_commands:
                 print('Plotly.deleteTraces')
@@ -291,14 +506,15 @@ class BaseFigureWidget(widgets.DOMWidget):
             self._py2js_deleteTraces = None
 
         # Compute move traces
-        new_inds = []
-
-        for uid in orig_uids_post_removal:
-            new_inds.append(new_uids.index(uid))
+        new_uid_inds = {uid: i for i, uid in enumerate(new_uids)}
+        new_inds = [new_uid_inds[uid] for uid in orig_uids_post_removal]
 
         current_inds = list(range(len(traces_props_post_removal)))
 
-        if not all([i1 == i2 for i1, i2 in zip(new_inds, current_inds)]):
+        # perm[j] is the current index of the trace that ends up at index j
+        perm = sorted(current_inds, key=new_inds.__getitem__)
+
+        if new_inds != current_inds:
 
             move_msg = [current_inds, new_inds]
 
@@ -311,27 +527,21 @@ class BaseFigureWidget(widgets.DOMWidget):
 
             # ### Reorder trace elements ###
             # We do so in-place so we don't trigger serialization
-            # pprint(self._traces_data)
-
-            # #### Remove by curr_inds in reverse order ####
-            moving_traces_data = []
-            for ci in reversed(current_inds):
-                # Push moving traces data to front of list
-                moving_traces_data.insert(0, self._data[ci])
-                del self._data[ci]
-
-            # #### Sort new_inds and moving_traces_data by new_inds ####
-            new_inds, moving_traces_data = zip(*sorted(zip(new_inds, moving_traces_data)))
-
-            # #### Insert by new_inds in forward order ####
-            for ni, trace_data in zip(new_inds, moving_traces_data):
-                self._data.insert(ni, trace_data)
-
-            # pprint(self._traces_data)
+            traces_data = self._data
+            traces_data[:] = [traces_data[ci] for ci in perm]
 
         # Update _traces order
-        self._data_defaults = [_trace for i, _trace in sorted(zip(new_inds, traces_prop_defaults_post_removal))]
+        self._data_defaults = [traces_prop_defaults_post_removal[ci] for ci in perm]
         self._data_objs = tuple(new_data)
+        self._update_data_obj_inds()
+
+    def _update_data_obj_inds(self):
+        """
+        Rebuild the mapping from trace object id to trace index
+
+        Must be called whenever _data_objs is reordered or traces are removed
+        """
+        self._data_obj_inds = {id(trace): i for i, trace in enumerate(self._data_objs)}
 
     def restyle(self, style, trace_indexes=None):
         if trace_indexes is None:
@@ -368,30 +578,31 @@ class BaseFigureWidget(widgets.DOMWidget):
                 raise ValueError('Restyling objects not supported, only individual properties\n'
                                  '    Received: {{k}: {v}}'.format(k=raw_key, v=v))
             else:
+                # Per-key values that don't depend on the trace
+                parent_path_steps = _key_path_steps(key_path)
+                last_key = key_path[-1]
+                num_vs = len(v)
+                num_traces = len(self._data)
+
                 restyle_msg_vs = []
                 any_vals_changed = False
                 for i, trace_ind in enumerate(trace_indexes):
-                    if trace_ind >= len(self._data):
+                    if trace_ind >= num_traces:
                         raise ValueError('Trace index {trace_ind} out of range'.format(trace_ind=trace_ind))
                     val_parent = self._data[trace_ind]
-                    for kp, key_path_el in enumerate(key_path[:-1]):
+                    for key_path_el, el_is_int, child_is_list in parent_path_steps:
 
                         # Extend val_parent list if needed
-                        if isinstance(val_parent, list) and isinstance(key_path_el, int):
+                        if el_is_int and isinstance(val_parent, list):
                             while len(val_parent) <= key_path_el:
                                 val_parent.append(None)
 
                         elif isinstance(val_parent, dict) and key_path_el not in val_parent:
-                            if isinstance(key_path[kp + 1], int):
-                                val_parent[key_path_el] = []
-                            else:
-                                val_parent[key_path_el] = {}
+                            val_parent[key_path_el] = [] if child_is_list else {}
 
                         val_parent = val_parent[key_path_el]
 
-                    last_key = key_path[-1]
-
-                    trace_v = v[i % len(v)]
+                    trace_v = v[i % num_vs]
 
                     restyle_msg_vs.append(trace_v)
 
@@ -433,20 +644,21 @@ class BaseFigureWidget(widgets.DOMWidget):
             for trace_ind in trace_indexes:
 
                 parent_obj = self.data[trace_ind]
-                key_path_so_far = ()
-                keys_left = key_path
+                trace_plan = dispatch_plan[trace_ind]
 
                 # Iterate down the key path
-                for next_key in key_path:
+                for next_key, key_path_so_far, keys_left in _key_path_splits(key_path):
                     if next_key not in parent_obj:
                         # Not a property
                         break
 
                     if isinstance(parent_obj, BasePlotlyType):
-                        if key_path_so_far not in dispatch_plan[trace_ind]:
-                            dispatch_plan[trace_ind][key_path_so_far] = {'obj': parent_obj, 'changed_paths': set()}
+                        # Only objects with change callbacks are added to the plan
+                        if parent_obj._change_callbacks:
+                            if key_path_so_far not in trace_plan:
+                                trace_plan[key_path_so_far] = {'obj': parent_obj, 'changed_paths': []}
 
-                        dispatch_plan[trace_ind][key_path_so_far]['changed_paths'].add(keys_left)
+                            trace_plan[key_path_so_far]['changed_paths'].append(keys_left)
 
                         next_val = parent_obj[next_key]
                     elif isinstance(parent_obj, (list, tuple)):
@@ -455,8 +667,6 @@ class BaseFigureWidget(widgets.DOMWidget):
                         # Primitive value
                         break
 
-                    key_path_so_far = key_path_so_far + (next_key,)
-                    keys_left = keys_left[1:]
                     parent_obj = next_val
 
         # pprint(dispatch_plan)
@@ -467,6 +677,7 @@ class BaseFigureWidget(widgets.DOMWidget):
                 obj._dispatch_change_callbacks(changed_paths)
 
     def _send_restyle_msg(self, style, trace_indexes=None):
+        self.flush_updates()
         if not isinstance(trace_indexes, (list, tuple)):
             trace_indexes = [trace_indexes]
 
@@ -486,12 +697,13 @@ class BaseFigureWidget(widgets.DOMWidget):
             print('Plotly.restyle')
             pprint(restyle_msg, indent=4)
 
+        # Each message carries a fresh message id so it always differs from the previous value of the trait. There's
+        # no need to reset the trait to None afterwards, which would cost a second comm message to the front-end
         self._py2js_restyle = restyle_msg
-        self._py2js_restyle = None
 
     def _restyle_child(self, child, prop, val):
 
-        trace_index = self.data.index(child)
+        trace_index = self._data_obj_inds[id(child)]
 
         if not self._in_batch_mode:
             send_val = [val]
@@ -499,9 +711,7 @@ class BaseFigureWidget(widgets.DOMWidget):
             self._dispatch_change_callbacks_restyle(restyle, trace_index)
             self._send_restyle_msg(restyle, trace_indexes=trace_index)
         else:
-            if trace_index not in self._batch_style_commands:
-                self._batch_style_commands[trace_index] = {}
-            self._batch_style_commands[trace_index][prop] = val
+            self._batch_style_commands[(trace_index, prop)] = val
 
     def add_traces(self, data: typ.List['BaseTraceType']):
 
@@ -510,14 +720,17 @@ class BaseFigureWidget(widgets.DOMWidget):
             self._batch_style_commands.clear()
             raise ValueError('Traces may not be added in a batch context')
 
+        # Send queued updates first so that messages reach the front-end in order
+        self.flush_updates()
+
         if not isinstance(data, (list, tuple)):
             data = [data]
 
         # Validate
         data = self._data_validator.validate_coerce(data)
 
-        # Make deep copy of trace data (Optimize later if needed)
-        new_traces_data = [deepcopy(trace._props) for trace in data]
+        # Make deep copy of trace data
+        new_traces_data = [_clone_props(trace._props) for trace in data]
 
         # Update trace parent
         for trace in data:
@@ -525,9 +738,13 @@ class BaseFigureWidget(widgets.DOMWidget):
             trace._orphan_props.clear()
 
         # Update python side
+        # Extend lists and index in place rather than rebuilding them, so that adding traces one at a time doesn't
+        # cost time proportional to the number of existing traces
+        num_traces = len(self._data_objs)
         self._data.extend(new_traces_data)  # append instead of assignment so we don't trigger serialization
-        self._data_defaults = self._data_defaults + [{} for trace in data]
+        self._data_defaults.extend({} for trace in data)
         self._data_objs = self._data_objs + data
+        self._data_obj_inds.update((id(trace), num_traces + i) for i, trace in enumerate(data))
 
         # Update messages
         relayout_msg_id = self._last_relayout_msg_id + 1
@@ -554,10 +771,7 @@ class BaseFigureWidget(widgets.DOMWidget):
         return data
 
     def _get_child_props(self, child):
-        try:
-            trace_index = self.data.index(child)
-        except ValueError as _:
-            trace_index = None
+        trace_index = self._data_obj_inds.get(id(child), None)
 
         if trace_index is not None:
             return self._data[trace_index]
@@ -567,10 +781,7 @@ class BaseFigureWidget(widgets.DOMWidget):
             raise ValueError('Unrecognized child: %s' % child)
 
     def _get_child_prop_defaults(self, child):
-        try:
-            trace_index = self.data.index(child)
-        except ValueError as _:
-            trace_index = None
+        trace_index = self._data_obj_inds.get(id(child), None)
 
         if trace_index is not None:
             return self._data_defaults[trace_index]
@@ -595,7 +806,10 @@ class BaseFigureWidget(widgets.DOMWidget):
 
         msg_id = delta.get('_relayout_msg_id')
         # print(f'layoutDelta: {msg_id} == {self._last_relayout_msg_id}')
-        if msg_id == self._last_relayout_msg_id:
+        # Skip deltas that have already been applied from another view
+        if msg_id == self._last_relayout_msg_id and not self._deltas_equal(delta, self._last_layout_delta):
+            self._last_layout_delta = delta
+
             # print('Processing layoutDelta')
             # print('layoutDelta: {deltas}'.format(deltas=delta))
             delta_transform = self.transform_data(self._layout_defaults, delta)
@@ -610,9 +824,11 @@ class BaseFigureWidget(widgets.DOMWidget):
 
             self._dispatch_change_callbacks_relayout(delta_transform)
             self._relayout_in_process = False
-            while self._waiting_relayout_callbacks:
-                # Call callbacks
-                self._waiting_relayout_callbacks.pop()()
+            # Call callbacks in the order they were registered. Swap in a new list first so that callbacks registered
+            # while these run are kept for the next relayout
+            waiting_callbacks, self._waiting_relayout_callbacks = self._waiting_relayout_callbacks, []
+            for callback in waiting_callbacks:
+                callback()
 
     @property
     def layout(self):
@@ -622,12 +838,16 @@ class BaseFigureWidget(widgets.DOMWidget):
     def layout(self, new_layout):
         # Validate layout
         new_layout = self._layout_validator.validate_coerce(new_layout)
-        new_layout_data = deepcopy(new_layout._props)
+        if new_layout._parent is None:
+            # Orphan layout. Take over its props dict rather than copying it
+            new_layout_data = new_layout._props
+        else:
+            new_layout_data = _clone_props(new_layout._props)
 
         # Unparent current layout
         if self._layout_obj:
-            old_layout_data = deepcopy(self._layout_obj._props)
-            self._layout_obj._orphan_props.update(old_layout_data)
+            # self._layout is released by the figure below, so it's handed to the old layout without a copy
+            self._layout_obj._orphan_props.update(self._layout)
             self._layout_obj._parent = None
 
         # Parent new layout
@@ -649,6 +869,7 @@ class BaseFigureWidget(widgets.DOMWidget):
             self._batch_layout_commands[prop] = send_val
 
     def _send_relayout_msg(self, layout):
+        self.flush_updates()
 
         if self._log_plotly_commands:
             print('Plotly.relayout')
@@ -658,8 +879,8 @@ class BaseFigureWidget(widgets.DOMWidget):
         layout['_relayout_msg_id'] = msg_id
         self._last_relayout_msg_id = msg_id
 
+        # Unique message id, no None reset needed (see _send_restyle_msg)
         self._py2js_relayout = layout
-        self._py2js_relayout = None
 
     @observe('_js2py_relayout')
     def handler_js2py_relayout(self, change):
@@ -694,19 +915,16 @@ class BaseFigureWidget(widgets.DOMWidget):
             key_path = self._str_to_dict_path(raw_key)
 
             val_parent = self._layout
-            for kp, key_path_el in enumerate(key_path[:-1]):
+            for key_path_el, el_is_int, child_is_list in _key_path_steps(key_path):
                 if key_path_el not in val_parent:
 
                     # Extend val_parent list if needed
-                    if isinstance(val_parent, list) and isinstance(key_path_el, int):
+                    if el_is_int and isinstance(val_parent, list):
                         while len(val_parent) <= key_path_el:
                             val_parent.append(None)
 
-                    elif isinstance(val_parent, dict) and key_path_el not in val_parent:
-                        if isinstance(key_path[kp+1], int):
-                            val_parent[key_path_el] = []
-                        else:
-                            val_parent[key_path_el] = {}
+                    elif isinstance(val_parent, dict):
+                        val_parent[key_path_el] = [] if child_is_list else {}
 
                 val_parent = val_parent[key_path_el]
 
@@ -748,18 +966,18 @@ class BaseFigureWidget(widgets.DOMWidget):
                 key_path = key_path[:-1]
 
             parent_obj = self.layout
-            key_path_so_far = ()
-            keys_left = key_path
 
             # Iterate down the key path
-            for next_key in key_path:
+            for next_key, key_path_so_far, keys_left in _key_path_splits(key_path):
                 if next_key not in parent_obj:
                     break
 
                 if isinstance(parent_obj, BasePlotlyType):
-                    if key_path_so_far not in dispatch_plan:
-                        dispatch_plan[key_path_so_far] = {'obj': parent_obj, 'changed_paths': set()}
-                    dispatch_plan[key_path_so_far]['changed_paths'].add(keys_left)
+                    # Only objects with change callbacks are added to the plan
+                    if parent_obj._change_callbacks:
+                        if key_path_so_far not in dispatch_plan:
+                            dispatch_plan[key_path_so_far] = {'obj': parent_obj, 'changed_paths': []}
+                        dispatch_plan[key_path_so_far]['changed_paths'].append(keys_left)
 
                     next_val = parent_obj[next_key]
                     # parent_obj._dispatch_change_callbacks(next_key, next_val)
@@ -769,8 +987,6 @@ class BaseFigureWidget(widgets.DOMWidget):
                     # Primitive value
                     break
 
-                key_path_so_far = key_path_so_far + (next_key,)
-                keys_left = keys_left[1:]
                 parent_obj = next_val
 
         # pprint(dispatch_plan)
@@ -802,20 +1018,18 @@ class BaseFigureWidget(widgets.DOMWidget):
             # Nothing to do
             return None, None, None
 
-        if style is None:
-            style = {}
-        if layout is None:
-            layout = {}
-
         # Process trace indexes
         if trace_indexes is None:
             trace_indexes = list(range(len(self.data)))
-
-        if not isinstance(trace_indexes, (list, tuple)):
+        elif isinstance(trace_indexes, tuple):
+            # _perform_restyle_dict only accepts lists
+            trace_indexes = list(trace_indexes)
+        elif not isinstance(trace_indexes, list):
             trace_indexes = [trace_indexes]
 
-        relayout_msg = self._perform_relayout_dict(layout)
-        restyle_msg = self._perform_restyle_dict(style, trace_indexes)
+        # Only one of style / layout is often given. Skip the other
+        relayout_msg = self._perform_relayout_dict(layout) if layout else {}
+        restyle_msg = self._perform_restyle_dict(style, trace_indexes) if style else {}
         # print(style, trace_indexes, restyle_msg)
         # pprint(self._traces_data)
         return restyle_msg, relayout_msg, trace_indexes
@@ -825,26 +1039,146 @@ class BaseFigureWidget(widgets.DOMWidget):
         if not isinstance(trace_indexes, (list, tuple)):
             trace_indexes = [trace_indexes]
 
-        # Add restyle message id
-        restyle_msg_id = self._last_restyle_msg_id + 1
-        style['_restyle_msg_id'] = restyle_msg_id
-        self._last_restyle_msg_id = restyle_msg_id
-        self._restyle_in_process = True
+        # Update message ids. These are bumped right away, even if the message is queued, so that deltas for earlier
+        # messages are ignored and completion callbacks wait for this update
+        self._next_msg_ids()
+
+        if self._update_coalesce_interval:
+            loop = self._get_running_loop()
+            if loop is not None:
+                self._queue_update_msg(style, layout, trace_indexes)
+                if self._pending_update_handle is None:
+                    self._pending_update_handle = loop.call_later(self._update_coalesce_interval, self.flush_updates)
+                return
+
+        self._write_update_msg(style, layout, trace_indexes)
+
+    def _queue_update_msg(self, style, layout, trace_indexes):
+        if self._pending_update is None:
+            self._pending_update = ({}, {}, {})
+
+        pending_styles, pending_layout, pending_style_extras = self._pending_update
+
+        # Merge style, one value per trace and property, keyed by (trace_index, prop) like _batch_style_commands.
+        # Later values replace earlier ones and move to the end so that they're still applied after any values queued
+        # in between
+        for prop, vals in style.items():
+            if prop.startswith('_'):
+                # Properties with leading underscores passed through as-is
+                pending_style_extras[prop] = vals
+                continue
 
-        # Add relayout message id
-        relayout_msg_id = self._last_relayout_msg_id + 1
-        layout['_relayout_msg_id'] = relayout_msg_id
-        self._last_relayout_msg_id = relayout_msg_id
+            if not isinstance(vals, list):
+                vals = [vals]
+
+            for i, trace_ind in enumerate(trace_indexes):
+                trace_val = vals[i % len(vals)]
+                if trace_val is Undefined:
+                    continue
+
+                style_key = (trace_ind, prop)
+                pending_styles.pop(style_key, None)
+                pending_styles[style_key] = trace_val
+
+        # Merge layout
+        for prop, val in layout.items():
+            pending_layout.pop(prop, None)
+            pending_layout[prop] = val
+
+    @property
+    def update_coalesce_interval(self):
+        """
+        Number of seconds to collect update messages for before sending them to the front-end as a single message
+
+        While updates are being collected, later values for a trace or layout property replace earlier ones, so rapid
+        repeated updates (e.g. from a slider callback) send only their final values. Updates are only collected while
+        an asyncio event loop is running (as it is in a Jupyter kernel). Otherwise, and when the interval is 0 (the
+        default), each update is sent immediately. Call flush_updates to send collected updates right away
+
+        Returns
+        -------
+        float
+        """
+        return self._update_coalesce_interval
+
+    @update_coalesce_interval.setter
+    def update_coalesce_interval(self, val):
+        if isinstance(val, bool) or not isinstance(val, numbers.Number) or val < 0:
+            raise ValueError('update_coalesce_interval must be a non-negative number of seconds.\n'
+                             '    Received value: {val}'.format(val=repr(val)))
+
+        self._update_coalesce_interval = val
+        if not val:
+            # Don't leave collected updates waiting on a timer
+            self.flush_updates()
+
+    def flush_updates(self):
+        """
+        Send any update messages that are being collected (see update_coalesce_interval) to the front-end now
+
+        Returns
+        -------
+        None
+        """
+        if self._pending_update_handle is not None:
+            self._pending_update_handle.cancel()
+            self._pending_update_handle = None
+
+        if self._pending_update is None:
+            return
+
+        pending_styles, pending_layout, pending_style_extras = self._pending_update
+        self._pending_update = None
+
+        style, layout, trace_indexes = self._build_update_params(pending_styles, pending_layout)
+        style.update(pending_style_extras)
+        self._write_update_msg(style, layout, trace_indexes)
+
+    @staticmethod
+    def _get_running_loop():
+        try:
+            return asyncio.get_running_loop()
+        except RuntimeError as _:
+            # No loop running in this thread. Updates are sent immediately
+            return None
+
+    def _next_msg_ids(self, restyle=True):
+        """
+        Bump both the restyle and relayout message ids for a message that does both (update / animate) and mark
+        them as in process
+
+        Parameters
+        ----------
+        restyle : bool
+            If False, leave the restyle message id and state alone. Used for messages that no style delta will be
+            reported back for, since the restyle would never complete
+
+        Returns
+        -------
+        (int, int)
+            Restyle and relayout message ids
+        """
+        if restyle:
+            self._last_restyle_msg_id += 1
+            self._restyle_in_process = True
+
+        self._last_relayout_msg_id += 1
         self._relayout_in_process = True
 
+        return self._last_restyle_msg_id, self._last_relayout_msg_id
+
+    def _write_update_msg(self, style, layout, trace_indexes):
+        style['_restyle_msg_id'] = self._last_restyle_msg_id
+        layout['_relayout_msg_id'] = self._last_relayout_msg_id
+
         update_msg = (style, layout, trace_indexes)
 
         if self._log_plotly_commands:
             print('Plotly.update')
             pprint(update_msg, indent=4)
 
+        # Unique message id, no None reset needed (see _send_restyle_msg)
         self._py2js_update = update_msg
-        self._py2js_update = None
 
     # Callbacks
     # ---------
@@ -882,33 +1216,32 @@ class BaseFigureWidget(widgets.DOMWidget):
         else:
             state = None
 
-        # Build Trace Points Dictionary
-        # -----------------------------
+        # Group Points by Trace
+        # ---------------------
+        # Stable sort on the curve numbers keeps the points of each trace in their original order. bounds[i] is then
+        # the position of the first point that belongs to trace i
         points_data = callback_data['points']
-        trace_points = {trace_ind: {'point_inds': [],
-                                    'xs': [],
-                                    'ys': [],
-                                    'trace_name': self._data_objs[trace_ind].name,
-                                    'trace_index': trace_ind}
-                        for trace_ind in range(len(self._data_objs))}
-
-        for x, y, point_ind, trace_ind in zip(points_data['xs'],
-                                                  points_data['ys'],
-                                                  points_data['pointNumbers'],
-                                                  points_data['curveNumbers']):
-
-            trace_dict = trace_points[trace_ind]
-            trace_dict['xs'].append(x)
-            trace_dict['ys'].append(y)
-            trace_dict['point_inds'].append(point_ind)
+        xs = points_data['xs']
+        ys = points_data['ys']
+        point_nums = points_data['pointNumbers']
+
+        num_traces = len(self._data_objs)
+        curve_nums = np.asarray(points_data['curveNumbers'], dtype=int)
+        order = np.argsort(curve_nums, kind='stable')
+        bounds = np.searchsorted(curve_nums[order], np.arange(num_traces + 1)).tolist()
+        order = order.tolist()
 
         # TODO: send empty points event to all traces that were note included
 
         # Dispatch callbacks
         # ------------------
-        for trace_ind, trace_points_data in trace_points.items():
-            points = Points(**trace_points_data)
-            trace = self.data[trace_ind]  # type: BaseTraceType
+        for trace_ind, trace in enumerate(self._data_objs):  # type: int, BaseTraceType
+            trace_order = order[bounds[trace_ind]:bounds[trace_ind + 1]]
+            points = Points(point_inds=list(map(point_nums.__getitem__, trace_order)),
+                            xs=list(map(xs.__getitem__, trace_order)),
+                            ys=list(map(ys.__getitem__, trace_order)),
+                            trace_name=trace.name,
+                            trace_index=trace_ind)
 
             if event_type == 'plotly_click':
                 trace._dispatch_on_click(points, state)
@@ -947,27 +1280,28 @@ class BaseFigureWidget(widgets.DOMWidget):
                 self._send_batch_update()
 
     def _build_update_params_from_batch(self):
+        return self._build_update_params(self._batch_style_commands, self._batch_layout_commands)
+
+    @staticmethod
+    def _build_update_params(batch_style_commands, batch_layout_commands):
         # Handle Style / Trace Indexes
         # ----------------------------
-        batch_style_commands = self._batch_style_commands
-        trace_indexes = sorted(set([trace_ind for trace_ind in batch_style_commands]))
-
-        all_props = sorted(set([prop
-                                for trace_style in self._batch_style_commands.values()
-                                for prop in trace_style]))
+        # batch_style_commands is keyed by (trace_index, prop) tuples
+        trace_indexes = sorted({trace_ind for trace_ind, _ in batch_style_commands})
+        all_props = sorted({trace_prop for _, trace_prop in batch_style_commands})
 
         # Initialize style dict with all values undefined
-        style = {prop: [Undefined for _ in range(len(trace_indexes))]
-                 for prop in all_props}
+        num_traces = len(trace_indexes)
+        style = {prop: [Undefined] * num_traces for prop in all_props}
 
         # Fill in values
-        for trace_ind, trace_style in batch_style_commands.items():
-            for trace_prop, trace_val in trace_style.items():
-                style[trace_prop][trace_indexes.index(trace_ind)] = trace_val
+        trace_positions = {trace_ind: trace_pos for trace_pos, trace_ind in enumerate(trace_indexes)}
+        for (trace_ind, trace_prop), trace_val in batch_style_commands.items():
+            style[trace_prop][trace_positions[trace_ind]] = trace_val
 
         # Handle Layout
         # -------------
-        layout = self._batch_layout_commands
+        layout = batch_layout_commands
 
         return style, layout, trace_indexes
 
@@ -1047,32 +1381,42 @@ class BaseFigureWidget(widgets.DOMWidget):
 
     def _send_batch_animate(self, animation_opts):
 
-        # Apply commands to internal dictionaries as an update
-        # ----------------------------------------------------
-        style, layout, trace_indexes = self._build_update_params_from_batch()
-        restyle_msg, relayout_msg, trace_indexes = self._perform_update_dict(style, layout, trace_indexes)
+        # Apply commands to internal dictionaries
+        # ---------------------------------------
+        # Styles are applied one trace at a time, so that the restyle messages (and so the animation) only hold the
+        # values that changed for each trace. Assignments that didn't change anything are left out
+        relayout_msg = self._perform_relayout_dict(self._batch_layout_commands) if self._batch_layout_commands else {}
 
-        # ### Perform restyle portion of animate ###
-        if restyle_msg:
-            self._dispatch_change_callbacks_restyle(restyle_msg, trace_indexes)
+        trace_styles = {}
+        for (trace_index, trace_prop), trace_val in self._batch_style_commands.items():
+            trace_styles.setdefault(trace_index, {})[trace_prop] = trace_val
+
+        restyle_msgs = {}
+        for trace_index, trace_style in trace_styles.items():
+            restyle_msg = self._perform_restyle_dict(trace_style, [trace_index])
+            if restyle_msg:
+                restyle_msgs[trace_index] = restyle_msg
+
+        # ### Dispatch change callbacks ###
+        for trace_index, restyle_msg in restyle_msgs.items():
+            self._dispatch_change_callbacks_restyle(restyle_msg, [trace_index])
 
-        # ### Perform relayout portion of update ###
         if relayout_msg:
             self._dispatch_change_callbacks_relayout(relayout_msg)
 
-        # Convert style / trace_indexes into animate form
-        # -----------------------------------------------
-        if self._batch_style_commands:
-            animate_styles, animate_trace_indexes = zip(*[
-                (trace_style, trace_index) for trace_index, trace_style in self._batch_style_commands.items()])
-        else:
-            animate_styles, animate_trace_indexes = {}, []
-
-        animate_layout = self._batch_layout_commands
+        # Convert into animate form
+        # -------------------------
+        # Each restyle message is for a single trace, so it holds a single value per property
+        animate_styles = [{trace_prop: trace_vals[0] for trace_prop, trace_vals in restyle_msg.items()}
+                          for restyle_msg in restyle_msgs.values()]
+        animate_trace_indexes = list(restyle_msgs)
+        animate_layout = relayout_msg
 
         # Send animate message to JS
         # --------------------------
-        self._send_animate_msg(list(animate_styles), animate_layout, list(animate_trace_indexes), animation_opts)
+        # Nothing to animate if every assignment was a no-op
+        if animate_trace_indexes or animate_layout:
+            self._send_animate_msg(animate_styles, animate_layout, animate_trace_indexes, animation_opts)
 
         # Clear batched commands
         # ----------------------
@@ -1080,45 +1424,40 @@ class BaseFigureWidget(widgets.DOMWidget):
         self._batch_style_commands.clear()
 
     def _send_animate_msg(self, styles, layout, trace_indexes, animation_opts):
+        self.flush_updates()
         # print(styles, layout, trace_indexes, animation_opts)
         if not isinstance(trace_indexes, (list, tuple)):
             trace_indexes = [trace_indexes]
 
-        # Add restyle message id
-        restyle_msg_id = self._last_restyle_msg_id + 1
-        for style in styles:
-            style['_restyle_msg_id'] = restyle_msg_id
-
-        self._last_restyle_msg_id = restyle_msg_id
-        self._restyle_in_process = True
-
-        # Add relayout message id
-        relayout_msg_id = self._last_relayout_msg_id + 1
-        layout['_relayout_msg_id'] = relayout_msg_id
-        self._last_relayout_msg_id = relayout_msg_id
-        self._relayout_in_process = True
+        # Message ids are sent once for the whole animation rather than stamped on each trace style. The view only
+        # reports style deltas for the animated traces, so without any there is no restyle to wait for
+        restyle_msg_id, relayout_msg_id = self._next_msg_ids(restyle=bool(trace_indexes))
 
         animate_msg = [{'data': styles,
                         'layout': layout,
-                        'traces': trace_indexes},
+                        'traces': trace_indexes,
+                        '_restyle_msg_id': restyle_msg_id,
+                        '_relayout_msg_id': relayout_msg_id},
                        animation_opts]
 
         if self._log_plotly_commands:
             print('Plotly.animate')
             pprint(animate_msg, indent=4)
 
+        # Unique message id, no None reset needed (see _send_restyle_msg)
         self._py2js_animate = animate_msg
-        self._py2js_animate = None
 
     # Exports
     # -------
     def to_dict(self):
-        data = deepcopy(self._data)
-        layout = deepcopy(self._layout)
+        data = _clone_props(self._data)
+        layout = _clone_props(self._layout)
         return {'data': data, 'layout': layout}
 
     def save_html(self, filename, auto_open=False, responsive=False):
-        data = self.to_dict()
+        # Only the top-level layout dict is modified below and the result is only serialized, so a shallow copy is
+        # enough here
+        data = {'data': list(self._data), 'layout': dict(self._layout)}
         if responsive:
             if 'height' in data['layout']:
                 data['layout'].pop('height')
@@ -1129,6 +1468,8 @@ class BaseFigureWidget(widgets.DOMWidget):
             data['layout']['height'] = self.layout.height
             data['layout']['width'] = self.layout.width
 
+        # Import here since plotly.offline is slow to import and only needed for html export
+        from plotly.offline import plot as plotlypy_plot
         plotlypy_plot(data, filename=filename, show_link=False, auto_open=auto_open, validate=False)
 
     def save_image(self, filename, image_type=None, scale_factor=2):
@@ -1176,10 +1517,8 @@ class BaseFigureWidget(widgets.DOMWidget):
 
         # Validate cairo dependency
         if image_type in cairo_image_types:
-            # Check whether we have cairosvg available
-            try:
-                import_module('cairosvg')
-            except ModuleNotFoundError:
+            # Check whether we have cairosvg available. It is imported later, in the image conversion worker thread
+            if find_spec('cairosvg') is None:
                 raise ImportError('Exporting to {image_type} requires cairosvg'
                                   .format(image_type=image_type))
 
@@ -1195,8 +1534,10 @@ class BaseFigureWidget(widgets.DOMWidget):
                                       'image_type': image_type,
                                       'scale_factor': scale_factor}
 
+        self.flush_updates()
+
+        # Unique request id, no None reset needed (see _send_restyle_msg)
         self._py2js_requestSvg = req_id
-        self._py2js_requestSvg = None
 
     def _do_save_image(self, req_id, svg_uri):
         req_info = self._svg_requests.pop(req_id, None)
@@ -1218,18 +1559,36 @@ class BaseFigureWidget(widgets.DOMWidget):
             with open(filename, 'wb') as f:
                 f.write(svg_bytes)
         else:
-            # We already made sure cairosvg is available in save_image
-            cairosvg = import_module('cairosvg')
-
-            if image_type == 'png':
-                cairosvg.svg2png(
-                    bytestring=svg_bytes, write_to=filename, scale=scale_factor)
-            elif image_type == 'pdf':
-                cairosvg.svg2pdf(
-                    bytestring=svg_bytes, write_to=filename)
-            elif image_type == 'ps':
-                cairosvg.svg2ps(
-                    bytestring=svg_bytes, write_to=filename)
+            # Convert in a worker thread so that the kernel keeps handling widget messages while cairo renders
+            if BaseFigureWidget._image_executor is None:
+                BaseFigureWidget._image_executor = ThreadPoolExecutor(max_workers=2)
+
+            future = BaseFigureWidget._image_executor.submit(
+                self._convert_svg_image, svg_bytes, filename, image_type, scale_factor)
+            future.add_done_callback(self._report_image_error)
+            return future
+
+    @staticmethod
+    def _convert_svg_image(svg_bytes, filename, image_type, scale_factor):
+        # We already made sure cairosvg is available in save_image
+        cairosvg = import_module('cairosvg')
+
+        if image_type == 'png':
+            cairosvg.svg2png(
+                bytestring=svg_bytes, write_to=filename, scale=scale_factor)
+        elif image_type == 'pdf':
+            cairosvg.svg2pdf(
+                bytestring=svg_bytes, write_to=filename)
+        elif image_type == 'ps':
+            cairosvg.svg2ps(
+                bytestring=svg_bytes, write_to=filename)
+
+    @staticmethod
+    def _report_image_error(future):
+        # Exceptions raised in the worker thread are otherwise silently stored on the future
+        exc = future.exception()
+        if exc is not None:
+            traceback.print_exception(type(exc), exc, exc.__traceback__)
 
     # Custom Messages
     # ---------------
@@ -1250,31 +1609,15 @@ class BaseFigureWidget(widgets.DOMWidget):
             # Nothing to do
             return raw_key
         else:
-            # Split string on periods. e.g. 'foo.bar[0]' -> ['foo', 'bar[0]']
-            key_path = raw_key.split('.')
-
-            # Split out bracket indexes. e.g. ['foo', 'bar[0]'] -> ['foo', 'bar', '0']
-            bracket_re = re.compile('(.*)\[(\d+)\]')
-            key_path2 = []
-            for key in key_path:
-                match = bracket_re.fullmatch(key)
-                if match:
-                    key_path2.extend(match.groups())
-                else:
-                    key_path2.append(key)
-
-            # Convert elements to ints if possible. e.g. e.g. ['foo', 'bar', '0'] -> ['foo', 'bar', 0]
-            for i in range(len(key_path2)):
-                try:
-                    key_path2[i] = int(key_path2[i])
-                except ValueError as _:
-                    pass
-
-            return tuple(key_path2)
+            return _parse_key_path(raw_key)
 
     @staticmethod
-    def _is_object_list(v):
-        return isinstance(v, list) and len(v) > 0 and isinstance(v[0], dict)
+    def _deltas_equal(delta1, delta2):
+        try:
+            return bool(delta1 == delta2)
+        except ValueError as _:
+            # Comparison of nested numpy arrays is ambiguous. Treat as unequal
+            return False
 
     @staticmethod
     def remove_overlapping_props(input_data, delta_data, prop_path=()):
@@ -1293,36 +1636,47 @@ class BaseFigureWidget(widgets.DOMWidget):
         List of removed property path tuples
         """
         removed = []
-        if isinstance(input_data, dict):
-            assert isinstance(delta_data, dict)
-
-            for p, delta_val in delta_data.items():
-                if isinstance(delta_val, dict) or BaseFigureWidget._is_object_list(delta_val):
-                    if p in input_data:
-                        input_val = input_data[p]
-                        removed.extend(
-                            BaseFigureWidget.remove_overlapping_props(
-                                input_val,
-                                delta_val,
-                                prop_path + (p,)))
-                elif p in input_data and p != 'uid':
-                    input_data.pop(p)
-                    removed.append(prop_path + (p,))
-
-        elif isinstance(input_data, list):
-            assert isinstance(delta_data, list)
-
-            for i, delta_val in enumerate(delta_data):
-                if i >= len(input_data):
-                    break
 
-                input_val = input_data[i]
-                if input_val is not None and isinstance(delta_val, dict) or BaseFigureWidget._is_object_list(delta_val):
-                    removed.extend(
-                        BaseFigureWidget.remove_overlapping_props(
-                            input_val,
-                            delta_val,
-                            prop_path + (i,)))
+        # The tree is walked depth first with an explicit stack rather than with recursive calls. Each stack entry
+        # holds a container from input_data, its path, and an iterator over the matching delta items still to visit
+        stack = []
+        next_node = (input_data, delta_data, prop_path)
+        while True:
+            if next_node is not None:
+                input_node, delta_node, node_path = next_node
+                next_node = None
+                if isinstance(input_node, dict):
+                    assert isinstance(delta_node, dict)
+                    stack.append((input_node, node_path, iter(delta_node.items()), True))
+                elif isinstance(input_node, list):
+                    assert isinstance(delta_node, list)
+                    stack.append((input_node, node_path, enumerate(delta_node[:len(input_node)]), False))
+
+            if not stack:
+                break
+
+            input_node, node_path, delta_items, is_dict = stack[-1]
+            for p, delta_val in delta_items:
+                # Recurse into dicts and lists of dicts (object lists)
+                is_container = isinstance(delta_val, dict) or (isinstance(delta_val, list) and
+                                                               len(delta_val) > 0 and
+                                                               isinstance(delta_val[0], dict))
+                if is_dict:
+                    if is_container:
+                        if p in input_node:
+                            next_node = (input_node[p], delta_val, node_path + (p,))
+                            break
+                    elif p in input_node and p != 'uid':
+                        input_node.pop(p)
+                        removed.append(node_path + (p,))
+                else:
+                    input_val = input_node[p]
+                    if input_val is not None and is_container:
+                        next_node = (input_val, delta_val, node_path + (p,))
+                        break
+            else:
+                # Done with this container
+                stack.pop()
 
         return removed
 
@@ -1341,74 +1695,118 @@ class BaseFigureWidget(widgets.DOMWidget):
 
         """
         relayout_terms = {}
-        if isinstance(to_data, dict):
-            if not isinstance(from_data, dict):
-                raise ValueError('Mismatched data types: to_data: {to_dict} {from_data}'.format(
-                    to_dict=to_data, from_data=from_data))
-
-            # Handle addition / modification of terms
-            for from_prop, from_val in from_data.items():
-                if isinstance(from_val, dict) or BaseFigureWidget._is_object_list(from_val):
-                    if from_prop not in to_data:
-                        to_data[from_prop] = {} if isinstance(from_val, dict) else []
-
-                    input_val = to_data[from_prop]
-                    relayout_terms.update(
-                        BaseFigureWidget.transform_data(
-                            input_val,
-                            from_val,
-                            should_remove=should_remove,
-                            relayout_path=relayout_path + (from_prop,)))
-                else:
-                    if from_prop not in to_data or not BasePlotlyType._vals_equal(to_data[from_prop], from_val):
-                        # if from_prop in to_data:
-                        #     print(f'to_data[from_prop] != from_val -- {to_data}[{from_prop}] != {from_val}:')
-                        to_data[from_prop] = from_val
-                        relayout_terms[relayout_path + (from_prop,)] = from_val
-
-            # Handle removal of terms
-            if should_remove:
-                for remove_prop in set(to_data.keys()).difference(set(from_data.keys())):
-                    to_data.pop(remove_prop)
-
-        elif isinstance(to_data, list):
-            if not isinstance(from_data, list):
-                raise ValueError('Mismatched data types: to_data: {to_data} {from_data}'.format(
-                    to_data=to_data, from_data=from_data))
-
-            for i, from_val in enumerate(from_data):
-                if i >= len(to_data):
-                    to_data.append(None)
-
-                input_val = to_data[i]
-                if input_val is not None and isinstance(from_val, dict) or BaseFigureWidget._is_object_list(from_val):
-                    relayout_terms.update(
-                        BaseFigureWidget.transform_data(
-                            input_val,
-                            from_val,
-                            should_remove=should_remove,
-                            relayout_path=relayout_path + (i,)))
+
+        # The tree is walked depth first with an explicit stack rather than with recursive calls. Each stack entry
+        # holds a container from to_data, the matching container from from_data, the path, and an iterator over the
+        # from_data items still to visit
+        stack = []
+        next_node = (to_data, from_data, relayout_path)
+        while True:
+            if next_node is not None:
+                to_node, from_node, node_path = next_node
+                next_node = None
+                if isinstance(to_node, dict):
+                    if not isinstance(from_node, dict):
+                        raise ValueError('Mismatched data types: to_data: {to_dict} {from_data}'.format(
+                            to_dict=to_node, from_data=from_node))
+
+                    stack.append((to_node, from_node, node_path, iter(from_node.items()), True))
+
+                elif isinstance(to_node, list):
+                    if not isinstance(from_node, list):
+                        raise ValueError('Mismatched data types: to_data: {to_data} {from_data}'.format(
+                            to_data=to_node, from_data=from_node))
+
+                    stack.append((to_node, from_node, node_path, enumerate(from_node), False))
+
+            if not stack:
+                break
+
+            to_node, from_node, node_path, from_items, is_dict = stack[-1]
+            for from_prop, from_val in from_items:
+                # Recurse into dicts and lists of dicts (object lists)
+                is_container = isinstance(from_val, dict) or (isinstance(from_val, list) and
+                                                              len(from_val) > 0 and
+                                                              isinstance(from_val[0], dict))
+                if is_dict:
+                    # Property names decoded from front-end messages are new string objects. Interning them lets the
+                    # defaults dicts and path tuples share one object per name, and later lookups match by identity
+                    if type(from_prop) is str:
+                        from_prop = sys.intern(from_prop)
+
+                    # Handle addition / modification of terms
+                    if is_container:
+                        if from_prop not in to_node:
+                            to_node[from_prop] = {} if isinstance(from_val, dict) else []
+
+                        next_node = (to_node[from_prop], from_val, node_path + (from_prop,))
+                        break
+                    elif from_prop not in to_node or not BasePlotlyType._vals_equal(to_node[from_prop], from_val):
+                        to_node[from_prop] = from_val
+                        relayout_terms[node_path + (from_prop,)] = from_val
                 else:
-                    if not BasePlotlyType._vals_equal(to_data[i], from_val):
-                        to_data[i] = from_val
-                        relayout_terms[relayout_path + (i,)] = from_val
+                    if from_prop >= len(to_node):
+                        to_node.append(None)
+
+                    input_val = to_node[from_prop]
+                    if input_val is not None and is_container:
+                        next_node = (input_val, from_val, node_path + (from_prop,))
+                        break
+                    elif not BasePlotlyType._vals_equal(input_val, from_val):
+                        to_node[from_prop] = from_val
+                        relayout_terms[node_path + (from_prop,)] = from_val
+            else:
+                # Done with this container
+                stack.pop()
+
+                # Handle removal of terms
+                if is_dict and should_remove:
+                    for remove_prop in set(to_node.keys()).difference(set(from_node.keys())):
+                        to_node.pop(remove_prop)
 
         return relayout_terms
 
 
+# Read-only placeholder for per-object dicts that most objects never write to. Replaced with a new dict on first write
+_empty_mapping = MappingProxyType({})
+
+
 class BasePlotlyType:
-    _validators = None
+    # Core attributes live in slots. __dict__ stays available for subclass attributes (and mocking), but it is only
+    # allocated for instances that actually set one, which leaves most nested compound objects (marker, line, ...)
+    # without an instance dict
+    __slots__ = ('_name', '_validators', '_compound_props', '_orphan_props', '_parent', '_parent_index',
+                 '_change_callbacks', '_prop_name', '__dict__')
+
+    # Generated subclasses override this with a staticmethod that returns a new {prop: validator} dict
+    _build_validators = None
 
     # Defaults to help mocking
     def __init__(self, name, **kwargs):
 
         self._name = name
         self._raise_on_invalid_property_error(**kwargs)
-        self._validators = {}
-        self._compound_props = {}
-        self._orphan_props = {}  # properties dict for use while object has no parent
+        self._validators = self._get_class_validators()
+        self._compound_props = _empty_mapping  # type: typ.Dict[str, typ.Any]
+        self._orphan_props = {}  # properties dict for use while object has no parent. None while it has one
         self._parent = None
-        self._change_callbacks = {}  # type: typ.Dict[typ.Tuple, typ.Callable]
+        self._parent_index = None  # position in the parent's array property, if this object is an element of one
+        self._change_callbacks = _empty_mapping  # type: typ.Dict[typ.Tuple, typ.Callable]
+
+    @classmethod
+    def _get_class_validators(cls) -> typ.Mapping[str, 'BaseValidator']:
+        """
+        Validators are stateless, so each generated class builds them once and all of its instances share a
+        read-only view of the same dict. Classes without _build_validators get a new, writable dict per instance
+        """
+        if cls._build_validators is None:
+            return {}
+
+        validators = cls.__dict__.get('_class_validators', None)
+        if validators is None:
+            validators = MappingProxyType(cls._build_validators())
+            cls._class_validators = validators
+        return validators
 
     @property
     def name(self):
@@ -1478,7 +1876,7 @@ class BasePlotlyType:
             if child.name not in self_props:
                 self_props[child.name] = {}
         elif isinstance(child_or_children, (list, tuple)):
-            child_ind = child_or_children.index(child)
+            child_ind = self._child_index(child_or_children, child)
             if child.name not in self_props:
                 # Initialize list
                 self_props[child.name] = []
@@ -1488,6 +1886,15 @@ class BasePlotlyType:
             while(len(child_list) <= child_ind):
                 child_list.append({})
 
+    @staticmethod
+    def _child_index(children, child):
+        # Use the index recorded by _set_array_prop, falling back to a scan if it is out of date
+        child_ind = child._parent_index
+        if child_ind is not None and child_ind < len(children) and children[child_ind] is child:
+            return child_ind
+        else:
+            return children.index(child)
+
     def _get_child_props(self, child):
         self_props = self.parent._get_child_props(self)
         if self_props is None:
@@ -1497,7 +1904,7 @@ class BasePlotlyType:
             if child is child_or_children:
                 return self_props.get(child.name, None)
             elif isinstance(child_or_children, (list, tuple)):
-                child_ind = child_or_children.index(child)
+                child_ind = self._child_index(child_or_children, child)
                 children_props = self_props.get(child.name, None)
                 return children_props[child_ind] \
                     if children_props is not None and len(children_props) > child_ind \
@@ -1524,7 +1931,7 @@ class BasePlotlyType:
             if child is child_or_children:
                 return self_prop_defaults.get(child.name, None)
             elif isinstance(child_or_children, (list, tuple)):
-                child_ind = child_or_children.index(child)
+                child_ind = self._child_index(child_or_children, child)
                 children_props = self_prop_defaults.get(child.name, None)
                 return children_props[child_ind] if children_props is not None else None
             else:
@@ -1571,13 +1978,54 @@ class BasePlotlyType:
             # Simple property
             self._set_prop(key, value)
 
+    def __deepcopy__(self, memo):
+        """
+        Deep copy this object as a new orphan object of the same type
+
+        Only the properties are copied. The parent chain (and so the figure this object belongs to) and any
+        registered callbacks are not. A copy of a trace gets a new uid, so that it can be added to the same figure
+        as the original
+
+        Parameters
+        ----------
+        memo : dict
+            deepcopy memo dict. copy.deepcopy records the copy in it, so repeated references to this object within
+            the same deepcopy call share one copy
+
+        Returns
+        -------
+        BasePlotlyType
+        """
+        # Skip props without a validator (e.g. a trace's type and message ids). They are not constructor arguments
+        props = self._props or {}
+        validators = self._validators
+        copy_kwargs = {k: _clone_props(v) for k, v in props.items() if k in validators}
+        if isinstance(self, BaseTraceType):
+            copy_kwargs.pop('uid', None)
+
+        return type(self)(**copy_kwargs)
+
     @property
     def _in_batch_mode(self):
-        return self.parent and self.parent._in_batch_mode
+        # Walk up to the first ancestor that is not a plotly type (normally the figure) in a loop rather than through
+        # one property call per nesting level
+        parent = self._parent
+        while isinstance(parent, BasePlotlyType):
+            parent = parent._parent
+
+        return parent and parent._in_batch_mode
 
     @staticmethod
     def _vals_equal(v1, v2):
-        if isinstance(v1, np.ndarray) or isinstance(v2, np.ndarray):
+        if v1 is v2:
+            # Same object. Skip the (potentially elementwise) comparison
+            return True
+
+        v1_type = type(v1)
+        if v1_type is type(v2) and v1_type in _immutable_prop_types:
+            # Plain scalars of the same type (the common case). Compare directly
+            return v1 == v2
+        elif isinstance(v1, np.ndarray) or isinstance(v2, np.ndarray):
             return np.array_equal(v1, v2)
         else:
             return v1 == v2
@@ -1590,17 +2038,27 @@ class BasePlotlyType:
         validator = self._validators.get(prop)
         val = validator.validate_coerce(val)
 
+        if self._in_batch_mode:
+            # Record every assignment. Props are not written until the batch is sent, so comparing against them here
+            # would drop an assignment that reverts an earlier one in the same batch. Unchanged values are filtered
+            # out when the batch is applied
+            self._send_update(prop, val)
+            return
+
+        # Resolving _props walks up the parent chain, so only do it once
+        props = self._props
         if val is None:
             # Check if we should send null update
-            if self._props and prop in self._props:
-                if not self._in_batch_mode:
-                    self._props.pop(prop)
+            if props and prop in props:
+                props.pop(prop)
                 self._send_update(prop, val)
         else:
-            self._init_props()
-            if prop not in self._props or not BasePlotlyType._vals_equal(self._props[prop], val):
-                if not self._in_batch_mode:
-                    self._props[prop] = val
+            if props is None:
+                self._init_props()
+                props = self._props
+
+            if prop not in props or not BasePlotlyType._vals_equal(props[prop], val):
+                props[prop] = val
                 self._send_update(prop, val)
 
     def _set_compound_prop(self, prop, val):
@@ -1608,45 +2066,66 @@ class BasePlotlyType:
             # Do nothing
             return
 
+        # Assigning the current value back (e.g. trace.marker = trace.marker) changes nothing. Checked before
+        # validation, which would replace the current object with a copy of itself
+        if val is not None and val is self._compound_props.get(prop, None):
+            return val
+
         # Validate coerce new value
         validator = self._validators.get(prop)
         val = validator.validate_coerce(val)  # type: BasePlotlyType
 
-        # Grab deep copies of current and new states
+        # Grab current and new states. The new value's props dict is moved into self._props as-is when the value is
+        # an orphan (it always is when the validator built it), so it is only copied if it belongs to another parent
         curr_val = self._compound_props.get(prop, None)
         if curr_val is not None:
-            curr_dict_val = deepcopy(curr_val._props)
+            curr_dict_val = curr_val._props
         else:
             curr_dict_val = None
 
-        if val is not None:
-            new_dict_val = deepcopy(val._props)
-        else:
+        if val is None:
             new_dict_val = None
+        elif val.parent is None:
+            new_dict_val = val._props
+        else:
+            new_dict_val = _clone_props(val._props)
 
-        # Update data dict
-        if not self._in_batch_mode:
+        # Compare now, while curr_dict_val is still the live dict in self._props. Skipped in batch mode, see _set_prop
+        in_batch_mode = self._in_batch_mode
+        changed = in_batch_mode or not BasePlotlyType._vals_equal(curr_dict_val, new_dict_val)
+
+        # Update data dict. Resolving _props walks up the parent chain, so only do it once
+        if not in_batch_mode:
+            props = self._props
             if not new_dict_val:
-                if prop in self._props:
-                    self._props.pop(prop)
+                if props:
+                    props.pop(prop, None)
             else:
-                self._init_props()
-                self._props[prop] = new_dict_val
+                if props is None:
+                    self._init_props()
+                    props = self._props
+                props[prop] = new_dict_val
 
         # Send update if there was a change in value
-        if not BasePlotlyType._vals_equal(curr_dict_val, new_dict_val):
+        if changed:
             self._send_update(prop, new_dict_val)
 
-        # Reparent new value and clear orphan data
+        # Reparent new value and drop orphan data. Don't clear it, new_dict_val may be the old orphan dict. Parented
+        # objects don't read _orphan_props, so no empty dict is allocated until the object is orphaned again
         val._parent = self
-        val._orphan_props.clear()
+        val._orphan_props = None
 
-        # Reparent old value and update orphan data
+        # Reparent old value and update orphan data. Outside of batch mode the old dict is no longer in self._props,
+        # so it can be handed over without a copy
         if curr_val is not None and curr_val is not val:
-            if curr_dict_val is not None:
-                curr_val._orphan_props.update(curr_dict_val)
+            if curr_dict_val is None:
+                curr_val._orphan_props = {}
+            else:
+                curr_val._orphan_props = _clone_props(curr_dict_val) if in_batch_mode else curr_dict_val
             curr_val._parent = None
 
+        if self._compound_props is _empty_mapping:
+            self._compound_props = {}
         self._compound_props[prop] = val
         return val
 
@@ -1659,43 +2138,64 @@ class BasePlotlyType:
         validator = self._validators.get(prop)
         val = validator.validate_coerce(val)  # type: tuple
 
-        # Update data dict
+        # Grab current and new states. Props of orphan elements are moved as-is (see _set_compound_prop). Elements
+        # passed in as instances may still belong to a parent, so their props are copied
         curr_val = self._compound_props.get(prop, None)
+
+        # Assigning the current elements back (e.g. layout.annotations = layout.annotations) changes nothing. The
+        # validator keeps element instances, so compare them by identity
+        if curr_val is not None and len(val) == len(curr_val) and all(map(operator.is_, val, curr_val)):
+            return curr_val
+
         if curr_val is not None:
-            curr_dict_vals = [deepcopy(cv._props) for cv in curr_val]
+            curr_dict_vals = [cv._props for cv in curr_val]
         else:
             curr_dict_vals = None
 
         if val is not None:
-            new_dict_vals = [deepcopy(nv._props) for nv in val]
+            new_dict_vals = [nv._props if nv.parent is None else _clone_props(nv._props) for nv in val]
         else:
             new_dict_vals = None
 
-        # Update data dict
-        if not self._in_batch_mode:
+        # Compare now, while curr_dict_vals are still the live dicts in self._props. Skipped in batch mode, see
+        # _set_prop
+        in_batch_mode = self._in_batch_mode
+        changed = in_batch_mode or not BasePlotlyType._vals_equal(curr_dict_vals, new_dict_vals)
+
+        # Update data dict. Resolving _props walks up the parent chain, so only do it once
+        if not in_batch_mode:
+            props = self._props
             if not new_dict_vals:
-                if prop in self._props:
-                    self._props.pop(prop)
+                if props:
+                    props.pop(prop, None)
             else:
-                self._init_props()
-                self._props[prop] = new_dict_vals
+                if props is None:
+                    self._init_props()
+                    props = self._props
+                props[prop] = new_dict_vals
 
         # Send update if there was a change in value
-        if not BasePlotlyType._vals_equal(curr_dict_vals, new_dict_vals):
+        if changed:
             self._send_update(prop, new_dict_vals)
 
-        # Reparent new values and clear orphan data
+        # Reparent new values and drop orphan data (see _set_compound_prop)
         if val is not None:
-            for v in val:
-                v._orphan_props.clear()
+            for i, v in enumerate(val):
+                v._orphan_props = None
                 v._parent = self
+                v._parent_index = i
 
         # Reparent
         if curr_val is not None:
             for cv, cv_dict in zip(curr_val, curr_dict_vals):
-                if cv_dict is not None:
-                    cv._orphan_props.update(cv_dict)
+                if cv_dict is None:
+                    cv._orphan_props = {}
+                else:
+                    cv._orphan_props = _clone_props(cv_dict) if in_batch_mode else cv_dict
                 cv._parent = None
+                cv._parent_index = None
+        if self._compound_props is _empty_mapping:
+            self._compound_props = {}
         self._compound_props[prop] = val
         return val
 
@@ -1703,15 +2203,15 @@ class BasePlotlyType:
         raise NotImplementedError()
 
     def _update_child(self, child, prop, val):
-        child_prop_val = getattr(self, child.name)
-        if isinstance(child_prop_val, (list, tuple)):
-            child_ind = child_prop_val.index(child)
-            obj_path = '{child_name}.{child_ind}.{prop}'.format(
-                child_name=child.name,
-                child_ind=child_ind,
-                prop=prop)
+        # Runs for every nesting level of every property update, so look the child up directly rather than through
+        # its property, and build the path by concatenation rather than str.format
+        child_name = child.name
+        child_prop_val = self._compound_props[child_name]
+        if isinstance(child_prop_val, tuple):
+            child_ind = self._child_index(child_prop_val, child)
+            obj_path = child_name + '.' + str(child_ind) + '.' + prop
         else:
-            obj_path = '{child_name}.{prop}'.format(child_name=child.name, prop=prop)
+            obj_path = child_name + '.' + prop
 
         self._send_update(obj_path, val)
 
@@ -1725,12 +2225,16 @@ class BasePlotlyType:
     # ---------
     def _dispatch_change_callbacks(self, changed_paths):
         # print(f'Change callback: {self.prop_name} - {changed_paths}')
+        if not self._change_callbacks:
+            return
+
+        # Dedupe here. Callers pass paths as a list
         changed_paths = set(changed_paths)
         # pprint(changed_paths)
         for callback_paths, callback in self._change_callbacks.items():
-            # pprint(set(callback_paths))
-            common_paths = changed_paths.intersection(set(callback_paths))
-            if common_paths:
+            # isdisjoint iterates callback_paths (usually one or two paths) and stops at the first hit, without
+            # building a set for it
+            if not changed_paths.isdisjoint(callback_paths):
                 # Invoke callback
                 callback_args = [self[cb_path] for cb_path in callback_paths]
                 callback(self, *callback_args)
@@ -1761,6 +2265,8 @@ class BasePlotlyType:
         validated_args = tuple([a if isinstance(a, tuple) else (a,) for a in args])
 
         # TODO: add append arg and store list of callbacks
+        if self._change_callbacks is _empty_mapping:
+            self._change_callbacks = {}
         self._change_callbacks[validated_args] = callback
 
 
@@ -1785,6 +2291,10 @@ class BaseLayoutType(BaseLayoutHierarchyType):
 
     _subplotid_prop_re = re.compile('(' + '|'.join(_subplotid_prop_names) + ')(\d+)')
 
+    # Validators for subplot properties (e.g. xaxis2), keyed by property name. Shared by all layouts since validators
+    # are stateless
+    _subplotid_prop_validators = {}
+
     def __init__(self, name, **kwargs):
         # Compute invalid kwargs. Pass to parent for error message
         invalid_kwargs = {k: v for k, v in kwargs.items()
@@ -1794,10 +2304,15 @@ class BaseLayoutType(BaseLayoutHierarchyType):
         for prop, value in kwargs.items():
             self._set_subplotid_prop(prop, value)
 
-    def _set_subplotid_prop(self, prop, value):
-        # We already tested for match in constructor
-        match = self._subplotid_prop_re.fullmatch(prop)
+    def _set_subplotid_prop(self, prop, value, match=None):
+        # We already tested for match in constructor / __setattr__. match may be passed in to avoid matching again
+        if match is None:
+            match = self._subplotid_prop_re.fullmatch(prop)
         subplot_prop = match.group(1)
+
+        # prop becomes a key of the validators, subplot and props dicts. It may come from a user dict (e.g. layout
+        # JSON) rather than an identifier, so intern it like the generated property names
+        prop = sys.intern(prop)
         suffix_digit = int(match.group(2))
         if suffix_digit in [0, 1]:
             raise TypeError('Subplot properties may only be suffixed by an integer > 1\n'
@@ -1805,7 +2320,15 @@ class BaseLayoutType(BaseLayoutHierarchyType):
 
         # Add validator
         if prop not in self._validators:
-            validator = self._subplotid_validators[subplot_prop](prop_name=prop)
+            if isinstance(self._validators, MappingProxyType):
+                # Subplot validators belong to this instance only. Copy the shared class validators before adding
+                self._validators = dict(self._validators)
+
+            validator = self._subplotid_prop_validators.get(prop, None)
+            if validator is None:
+                validator = self._subplotid_validators[subplot_prop](prop_name=prop)
+                self._subplotid_prop_validators[prop] = validator
+
             self._validators[prop] = validator
 
         # Import value
@@ -1821,13 +2344,18 @@ class BaseLayoutType(BaseLayoutHierarchyType):
 
     def __setattr__(self, prop, value):
         # Check for subplot assignment (e.g. xaxis2)
-        # Call _set_compound_prop with the xaxis validator
-        match = self._subplotid_prop_re.fullmatch(prop)
+        # Call _set_compound_prop with the xaxis validator. Private attributes and names that don't end in a digit
+        # can't be subplot properties, so skip the regex for them
+        if prop.startswith('_') or not prop[-1:].isdigit():
+            match = None
+        else:
+            match = self._subplotid_prop_re.fullmatch(prop)
+
         if match is None:
             # Try setting as ordinary property
             super().__setattr__(prop, value)
         else:
-            self._set_subplotid_prop(prop, value)
+            self._set_subplotid_prop(prop, value, match)
 
     def __dir__(self):
         # Include any active subplot values (xaxis2 etc.)
@@ -1845,13 +2373,15 @@ class BaseTraceHierarchyType(BasePlotlyType):
 
 
 class BaseTraceType(BaseTraceHierarchyType):
+    __slots__ = ('_event_callbacks',)
+
     def __init__(self, name, **kwargs):
         super().__init__(name, **kwargs)
 
-        self._hover_callbacks = []
-        self._unhover_callbacks = []
-        self._click_callbacks = []
-        self._select_callbacks = []
+        # ### Event callbacks ###
+        # Lists of callbacks keyed by event type ('hover', 'unhover', 'click', 'selected'). Created on first
+        # registration since most traces never have any
+        self._event_callbacks = None
 
     # uid
     # ---
@@ -1886,52 +2416,50 @@ class BaseTraceType(BaseTraceHierarchyType):
         -------
         None
         """
-        if not append:
-            self._hover_callbacks.clear()
-
-        if callback:
-            self._hover_callbacks.append(callback)
+        self._register_event_callback('hover', callback, append)
 
     def _dispatch_on_hover(self, points: Points, state: InputState):
-        for callback in self._hover_callbacks:
-            callback(self, points, state)
+        self._dispatch_event_callbacks('hover', points, state)
 
     # Unhover
     # -------
     def on_unhover(self, callback: typ.Callable[['BaseTraceType', Points, InputState], None], append=False):
-        if not append:
-            self._unhover_callbacks.clear()
-
-        if callback:
-            self._unhover_callbacks.append(callback)
+        self._register_event_callback('unhover', callback, append)
 
     def _dispatch_on_unhover(self, points: Points, state: InputState):
-        for callback in self._unhover_callbacks:
-            callback(self, points, state)
+        self._dispatch_event_callbacks('unhover', points, state)
 
     # Click
     # -----
     def on_click(self, callback: typ.Callable[['BaseTraceType', Points, InputState], None], append=False):
-        if not append:
-            self._click_callbacks.clear()
-        if callback:
-            self._click_callbacks.append(callback)
+        self._register_event_callback('click', callback, append)
 
     def _dispatch_on_click(self, points: Points, state: InputState):
-        for callback in self._click_callbacks:
-            callback(self, points, state)
+        self._dispatch_event_callbacks('click', points, state)
 
     # Select
     # ------
     def on_selected(self,
                     callback: typ.Callable[['BaseTraceType', Points, typ.Union[BoxSelector, LassoSelector]], None],
                     append=False):
-        if not append:
-            self._select_callbacks.clear()
-
-        if callback:
-            self._select_callbacks.append(callback)
+        self._register_event_callback('selected', callback, append)
 
     def _dispatch_on_selected(self, points: Points, selector: typ.Union[BoxSelector, LassoSelector]):
-        for callback in self._select_callbacks:
-            callback(self, points, selector)
+        self._dispatch_event_callbacks('selected', points, selector)
+
+    # Event callbacks
+    # ---------------
+    def _register_event_callback(self, event_type, callback, append):
+        if not append and self._event_callbacks:
+            self._event_callbacks.pop(event_type, None)
+
+        if callback:
+            if self._event_callbacks is None:
+                self._event_callbacks = {}
+            self._event_callbacks.setdefault(event_type, []).append(callback)
+
+    def _dispatch_event_callbacks(self, event_type, points, state):
+        callbacks = self._event_callbacks and self._event_callbacks.get(event_type)
+        if callbacks:
+            for callback in callbacks:
+                callback(self, points, state)
@@ -5,7 +5,6 @@ import uuid
 from importlib import import_module
 
 import io
-from copy import deepcopy
 
 import numpy as np
 import re
@@ -1225,7 +1224,9 @@ class BaseTracesValidator(BaseValidator):
                 if isinstance(v_el, trace_classes):
                     res.append(v_el)
                 elif isinstance(v_el, dict):
-                    v_copy = deepcopy(v_el)
+                    # Only 'type' is popped below, and the trace constructor validates (and so copies) every value.
+                    # A shallow copy is enough to leave the caller's dict untouched
+                    v_copy = dict(v_el)
 
                     if 'type' in v_copy:
                         trace_type = v_copy.pop('type')
@@ -2,6 +2,8 @@ import typing as typ
 
 
 class InputState:
+    __slots__ = ('_ctrl', '_alt', '_meta', '_shift', '_button', '_buttons')
+
     def __init__(self, ctrl=None, alt=None, shift=None, meta=None, button=None, buttons=None, **_):
         self._ctrl = ctrl
         self._alt = alt
@@ -104,6 +106,7 @@ InputState(ctrl={ctrl},
 
 
 class Points:
+    __slots__ = ('_point_inds', '_xs', '_ys', '_trace_name', '_trace_index')
 
     def __init__(self, point_inds=None, xs=None, ys=None, trace_name=None, trace_index=None):
         self._point_inds = point_inds
@@ -134,6 +137,8 @@ class Points:
 
 
 class BoxSelector:
+    __slots__ = ('_type', '_xrange', '_yrange')
+
     def __init__(self, xrange=None, yrange=None, **_):
         self._type = 'box'
         self._xrange = xrange
@@ -153,6 +158,8 @@ class BoxSelector:
 
 
 class LassoSelector:
+    __slots__ = ('_type', '_xs', '_ys')
+
     def __init__(self, xs=None, ys=None, **_):
         self._type = 'lasso'
         self._xs = xs
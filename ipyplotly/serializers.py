@@ -3,15 +3,76 @@
 from traitlets import Undefined
 import numpy as np
 
+# Numpy dtypes with a matching JavaScript TypedArray type on the front-end (see numpy_dtype_to_typedarray_type in
+# Figure.js). Arrays of these types are sent as binary buffers.
+_typedarray_dtypes = {'int8', 'int16', 'int32', 'uint8', 'uint16', 'uint32', 'float32', 'float64'}
+
+# Dtypes to convert unsupported numeric arrays to before sending them as binary buffers. JavaScript numbers are doubles,
+# so float64 is as precise as a JSON encoding of the values would be
+_typedarray_dtype_fallbacks = {'float16': 'float32'}
+
+# Types that are passed through to the JSON encoder unchanged. Checked first since most leaf values are one of these
+_json_scalar_types = {str, int, float, bool, type(None)}
+
+# Integer dtypes to try, smallest first, when shrinking integer arrays before sending them
+_int_dtypes = [np.int8, np.uint8, np.int16, np.uint16, np.int32, np.uint32]
+
+
+def _shrink_int_array(v):
+    """
+    Convert an integer array to the smallest integer dtype that can hold all of its values
+
+    This is lossless. The front-end converts the resulting TypedArray into plain JavaScript numbers regardless of dtype.
+
+    Parameters
+    ----------
+    v : np.ndarray
+        1-D array with an integer dtype
+
+    Returns
+    -------
+    np.ndarray
+        v itself if no smaller dtype is available
+    """
+    if v.size == 0:
+        return v
+
+    v_min, v_max = v.min(), v.max()
+    for int_dtype in _int_dtypes:
+        if np.dtype(int_dtype).itemsize >= v.dtype.itemsize:
+            break
+
+        info = np.iinfo(int_dtype)
+        if info.min <= v_min and v_max <= info.max:
+            return v.astype(int_dtype)
+
+    return v
+
+
 def _py_to_js(v, widget_manager):
     # print('_py_to_js')
     # print(v)
-    if isinstance(v, dict):
+    if type(v) in _json_scalar_types:
+        return v
+    elif isinstance(v, dict):
         return {k: _py_to_js(v, widget_manager) for k, v in v.items()}
     elif isinstance(v, (list, tuple)):
         return [_py_to_js(v, widget_manager) for v in v]
     elif isinstance(v, np.ndarray):
         if v.ndim == 1 and v.dtype.kind in ['u', 'i', 'f']:  # (un)signed integer or float
+            if v.dtype.kind in ['u', 'i']:
+                v = _shrink_int_array(v)
+            elif v.dtype == np.float64 and getattr(widget_manager, 'float32_arrays', False):
+                # Lossy. Only done when enabled on the figure (see BaseFigureWidget.float32_arrays)
+                v = v.astype(np.float32)
+
+            dtype_str = str(v.dtype)
+            if dtype_str not in _typedarray_dtypes:
+                # e.g. int64, uint64, or non-native byte order
+                v = v.astype(_typedarray_dtype_fallbacks.get(dtype_str, 'float64'))
+
+            # Binary buffers must be contiguous
+            v = np.ascontiguousarray(v)
             return {'buffer': memoryview(v), 'dtype': str(v.dtype), 'shape': v.shape}
         else:
             return v.tolist()
@@ -25,7 +86,9 @@ def _py_to_js(v, widget_manager):
 def _js_to_py(v, widget_manager):
     # print('_js_to_py')
     # print(v)
-    if isinstance(v, dict):
+    if type(v) in _json_scalar_types:
+        return Undefined if v == '_undefined_' else v
+    elif isinstance(v, dict):
         return {k: _js_to_py(v, widget_manager) for k, v in v.items()}
     elif isinstance(v, (list, tuple)):
         return [_js_to_py(v, widget_manager) for v in v]
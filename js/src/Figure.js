@@ -1060,8 +1060,8 @@ var FigureView = widgets.DOMWidgetView.extend({
                 var traceDeltas = new Array(trace_indexes.length);
                 var trace_data = that.model.get('_data');
                 var fullData = that.getFullData();
+                var restyle_msg_id = animationData['_restyle_msg_id'];
                 for (var i = 0; i < trace_indexes.length; i++) {
-                    var restyle_msg_id = styles[i]['_restyle_msg_id'];
                     traceDeltas[i] = that.create_delta_object(trace_data[trace_indexes[i]], fullData[trace_indexes[i]]);
                     traceDeltas[i]['_restyle_msg_id'] = restyle_msg_id;
                 }
@@ -1069,7 +1069,7 @@ var FigureView = widgets.DOMWidgetView.extend({
                 that.model.set('_js2py_styleDelta', traceDeltas);
 
                 // Send back layout delta
-                var relayout_msg_id = layout['_relayout_msg_id'];
+                var relayout_msg_id = animationData['_relayout_msg_id'];
                 var relayoutDelta = that.create_delta_object(that.model.get('_layout'), that.getFullLayout());
                 relayoutDelta['_relayout_msg_id'] = relayout_msg_id;
                 that.model.set('_js2py_layoutDelta', relayoutDelta);
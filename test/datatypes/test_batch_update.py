@@ -0,0 +1,128 @@
+from traitlets import Undefined
+from ipyplotly.basedatatypes import BaseFigureWidget
+from ipyplotly.datatypes import Figure
+
+
+# Build update params
+# -------------------
+def test_build_update_params_empty():
+    style, layout, trace_indexes = BaseFigureWidget._build_update_params({}, {})
+    assert style == {}
+    assert layout == {}
+    assert trace_indexes == []
+
+
+def test_build_update_params_positions():
+    batch_style_commands = {(3, 'opacity'): 0.5,
+                            (0, 'name'): 'a',
+                            (3, 'name'): 'b',
+                            (1, 'opacity'): 0.1}
+    batch_layout_commands = {'title': 'T'}
+
+    style, layout, trace_indexes = BaseFigureWidget._build_update_params(batch_style_commands,
+                                                                         batch_layout_commands)
+
+    assert trace_indexes == [0, 1, 3]
+    assert style == {'name': ['a', Undefined, 'b'],
+                     'opacity': [Undefined, 0.1, 0.5]}
+    assert layout == {'title': 'T'}
+
+
+def test_build_update_params_many_traces():
+    num_traces = 2000
+    batch_style_commands = {}
+    for trace_ind in reversed(range(0, 2 * num_traces, 2)):
+        batch_style_commands[(trace_ind, 'opacity')] = trace_ind
+        batch_style_commands[(trace_ind, 'name')] = str(trace_ind)
+
+    style, layout, trace_indexes = BaseFigureWidget._build_update_params(batch_style_commands, {})
+
+    assert trace_indexes == list(range(0, 2 * num_traces, 2))
+    assert style['opacity'] == trace_indexes
+    assert style['name'] == [str(trace_ind) for trace_ind in trace_indexes]
+
+
+# Batch update
+# ------------
+def test_batch_update_revert_layout_prop():
+    fig = Figure()
+    fig.layout.title = 'A'
+
+    with fig.batch_update():
+        fig.layout.title = 'B'
+        fig.layout.title = 'A'
+
+    assert fig.layout.title == 'A'
+
+
+def test_batch_update_revert_trace_prop():
+    fig = Figure()
+    trace = fig.add_scatter(y=[1, 2], opacity=0.5)
+
+    with fig.batch_update():
+        trace.opacity = 0.1
+        trace.opacity = 0.5
+        trace.name = 'new'
+        trace.name = None
+
+    assert trace.opacity == 0.5
+    assert trace.name is None
+
+
+# Batch animate
+# -------------
+def test_batch_animate_skips_unchanged_values():
+    fig = Figure()
+    fig.add_scatter(y=[1, 2], opacity=0.5)
+    fig.add_scatter(y=[3, 4], opacity=0.5)
+    fig.layout.title = 'A'
+
+    with fig.batch_animate():
+        fig.data[0].opacity = 0.5
+        fig.data[1].opacity = 0.1
+        fig.layout.title = 'A'
+        fig.layout.height = 300
+
+    animation_data, animation_opts = fig._py2js_animate
+    assert animation_data['traces'] == [1]
+    assert animation_data['data'] == [{'opacity': 0.1}]
+    assert animation_data['layout'] == {'height': 300}
+
+
+def test_batch_animate_all_unchanged():
+    fig = Figure()
+    fig.add_scatter(y=[1, 2], opacity=0.5)
+    fig.layout.title = 'A'
+    fig._restyle_in_process = False
+    fig._relayout_in_process = False
+    restyle_msg_id = fig._last_restyle_msg_id
+    animate_msgs = []
+    fig.observe(lambda change: animate_msgs.append(change['new']), names='_py2js_animate')
+
+    with fig.batch_animate():
+        fig.data[0].opacity = 0.5
+        fig.layout.title = 'A'
+
+    assert animate_msgs == []
+    assert fig._restyle_in_process is False
+    assert fig._relayout_in_process is False
+    assert fig._last_restyle_msg_id == restyle_msg_id
+
+
+def test_batch_animate_layout_only():
+    fig = Figure()
+    fig.add_scatter(y=[1, 2], opacity=0.5)
+    fig._restyle_in_process = False
+    restyle_msg_id = fig._last_restyle_msg_id
+
+    with fig.batch_animate():
+        fig.data[0].opacity = 0.5
+        fig.layout.height = 300
+
+    animation_data, animation_opts = fig._py2js_animate
+    assert animation_data['traces'] == []
+    assert animation_data['layout'] == {'height': 300}
+
+    # The view doesn't report a style delta without animated traces, so no restyle is waited for
+    assert fig._restyle_in_process is False
+    assert fig._last_restyle_msg_id == restyle_msg_id
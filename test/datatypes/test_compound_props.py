@@ -0,0 +1,127 @@
+from copy import deepcopy
+import numpy as np
+from ipyplotly.basedatatypes import _clone_props
+from ipyplotly.datatypes import Figure
+
+
+# Set compound props
+# ------------------
+def test_set_compound_prop_none_uninitialized():
+    fig = Figure()
+
+    # xaxis has no props in the layout yet
+    fig.layout.xaxis.titlefont = None
+    fig.layout.updatemenus = None
+
+    assert fig.layout._props == {}
+
+
+def test_set_compound_prop_roundtrip():
+    fig = Figure()
+
+    fig.layout.xaxis.titlefont = {'size': 3}
+    assert fig.layout._props == {'xaxis': {'titlefont': {'size': 3}}}
+
+    fig.layout.xaxis.titlefont = None
+    assert fig.layout._props == {'xaxis': {}}
+
+
+def test_set_compound_prop_same_object():
+    fig = Figure()
+    trace = fig.add_scatter(marker={'color': 'red'})
+    marker = trace.marker
+
+    trace.marker = trace.marker
+
+    assert trace.marker is marker
+    assert marker.parent is trace
+    assert marker.color == 'red'
+
+
+def test_set_array_prop_same_elements():
+    fig = Figure()
+    fig.layout.annotations = [{'x': 1}, {'x': 2}]
+    annotations = fig.layout.annotations
+
+    fig.layout.annotations = fig.layout.annotations
+    fig.layout.annotations = list(annotations)
+
+    assert fig.layout.annotations == annotations
+    assert all(annotation.parent is fig.layout for annotation in annotations)
+    assert annotations[1].x == 2
+
+
+# Clone props
+# -----------
+def test_clone_props_arrays():
+    readonly_arr = np.array([1, 2])
+    readonly_arr.flags['WRITEABLE'] = False
+    writeable_arr = np.array([3, 4])
+    props = {'x': readonly_arr, 'y': writeable_arr, 'marker': {'size': [1, 2]}}
+
+    props_copy = _clone_props(props)
+
+    assert props_copy['x'] is readonly_arr
+    assert props_copy['y'] is not writeable_arr
+    assert np.array_equal(props_copy['y'], writeable_arr)
+    assert props_copy['marker'] == {'size': [1, 2]}
+    assert props_copy['marker']['size'] is not props['marker']['size']
+
+
+# Deep copy
+# ---------
+def test_deepcopy_trace():
+    fig = Figure()
+    trace = fig.add_scatter(y=np.array([1, 2]), marker={'color': 'red'})
+
+    trace_copy = deepcopy(trace)
+
+    assert type(trace_copy) is type(trace)
+    assert trace_copy.parent is None
+    assert trace_copy.uid != trace.uid
+    assert trace_copy._props['marker'] == {'color': 'red'}
+    assert trace_copy._props['type'] == 'scatter'
+
+    # Arrays are copied
+    assert np.array_equal(trace_copy._props['y'], trace.y)
+    assert trace_copy._props['y'] is not trace.y
+
+
+def test_deepcopy_parented_trace_added_to_figure():
+    fig = Figure()
+    trace = fig.add_scatter(y=[1, 2], marker={'color': 'red'})
+
+    fig.add_traces([deepcopy(fig.data[0])])
+
+    trace_copy = fig.data[1]
+    assert trace_copy is not trace
+    assert trace_copy.uid != trace.uid
+    assert trace_copy.marker.color == 'red'
+    assert np.array_equal(trace_copy.y, trace.y)
+
+    # The original is unaffected
+    assert trace.parent is fig
+    trace_copy.marker.color = 'blue'
+    assert trace.marker.color == 'red'
+
+
+def test_deepcopy_memo():
+    fig = Figure()
+    marker = fig.add_scatter(marker={'color': 'red'}).marker
+
+    marker_copy1, marker_copy2 = deepcopy([marker, marker])
+
+    assert marker_copy1 is marker_copy2
+    assert marker_copy1 is not marker
+    assert marker_copy1._props == {'color': 'red'}
+
+
+# Instance dicts
+# --------------
+def test_trace_no_instance_dict():
+    fig = Figure()
+    trace = fig.add_scatter(marker={'color': 'red'})
+    trace.on_click(lambda *args: None)
+
+    assert trace.__dict__ == {}
+    assert trace.marker.__dict__ == {}
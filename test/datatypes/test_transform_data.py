@@ -0,0 +1,47 @@
+from ipyplotly.basedatatypes import BaseFigureWidget
+
+
+# Transform data
+# --------------
+def test_transform_data_nested():
+    to_data = {'marker': {'color': 'red', 'size': 3}, 'name': 'a'}
+    from_data = {'marker': {'color': 'blue', 'size': 3}}
+
+    relayout_terms = BaseFigureWidget.transform_data(to_data, from_data)
+
+    assert relayout_terms == {('marker', 'color'): 'blue'}
+    assert to_data == {'marker': {'color': 'blue', 'size': 3}}
+
+
+def test_transform_data_object_list():
+    to_data = {'annotations': [{'x': 0}]}
+    from_data = {'annotations': [{'x': 1}, {'y': 2}]}
+
+    relayout_terms = BaseFigureWidget.transform_data(to_data, from_data)
+
+    assert relayout_terms == {('annotations', 0, 'x'): 1,
+                              ('annotations', 1): {'y': 2}}
+    assert to_data == {'annotations': [{'x': 1}, {'y': 2}]}
+
+
+def test_transform_data_new_object_list_element():
+    # A new list element that is itself an object list is assigned, not recursed into
+    to_data = {'a': [{'x': 0}]}
+    from_data = {'a': [{'x': 0}, [{'y': 2}]]}
+
+    relayout_terms = BaseFigureWidget.transform_data(to_data, from_data)
+
+    assert relayout_terms == {('a', 1): [{'y': 2}]}
+    assert to_data == {'a': [{'x': 0}, [{'y': 2}]]}
+
+
+# Remove overlapping props
+# ------------------------
+def test_remove_overlapping_props():
+    input_data = {'uid': 'abc', 'marker': {'color': 'red', 'size': 3}, 'name': 'a'}
+    delta_data = {'uid': 'abc', 'marker': {'color': 'blue'}}
+
+    removed = BaseFigureWidget.remove_overlapping_props(input_data, delta_data)
+
+    assert removed == [('marker', 'color')]
+    assert input_data == {'uid': 'abc', 'marker': {'size': 3}, 'name': 'a'}
@@ -0,0 +1,106 @@
+import asyncio
+import pytest
+from ipyplotly.datatypes import Figure
+
+
+# Fixtures
+# --------
+def make_figure():
+    fig = Figure()
+    fig.add_scatter(y=[1, 2])
+    fig.add_bar(y=[3, 4])
+    return fig
+
+
+def record_messages(fig):
+    messages = []
+    fig.observe(lambda change: messages.append((change['name'], change['new'])),
+                names=['_py2js_update', '_py2js_restyle'])
+    return messages
+
+
+# Flush
+# -----
+def test_flush_queued_updates():
+    fig = make_figure()
+
+    fig._queue_update_msg({'opacity': 0.5}, {}, [0])
+    fig._queue_update_msg({'opacity': [0.2, 0.3], 'name': 'a'}, {'title': 'T'}, [0, 1])
+    fig.flush_updates()
+
+    style, layout, trace_indexes = fig._py2js_update
+    assert trace_indexes == [0, 1]
+    assert style['opacity'] == [0.2, 0.3]
+    assert style['name'] == ['a', 'a']
+    assert layout['title'] == 'T'
+    assert fig._pending_update is None
+
+
+# Interval
+# --------
+def test_update_coalesce_interval_default():
+    fig = make_figure()
+    assert fig.update_coalesce_interval == 0
+
+
+@pytest.mark.parametrize('val', [-1, 'a', None, True])
+def test_update_coalesce_interval_invalid(val):
+    fig = make_figure()
+    with pytest.raises(ValueError):
+        fig.update_coalesce_interval = val
+
+
+# Coalescing
+# ----------
+def test_updates_merged_within_interval():
+    fig = make_figure()
+    fig.update_coalesce_interval = 0.01
+    messages = record_messages(fig)
+
+    async def send_updates():
+        fig.update(style={'opacity': 0.5}, layout={'title': 'A', 'height': 300}, trace_indexes=0)
+        fig.update(style={'opacity': 0.2}, layout={'title': 'B'}, trace_indexes=[0, 1])
+
+        # Nothing is sent until the interval elapses
+        assert messages == []
+        await asyncio.sleep(0.05)
+
+    asyncio.run(send_updates())
+
+    assert len(messages) == 1
+    style, layout, trace_indexes = messages[0][1]
+    assert trace_indexes == [0, 1]
+    assert style['opacity'] == [0.2, 0.2]
+
+    # Later values replace earlier ones and move to the end
+    assert list(layout) == ['height', 'title', '_relayout_msg_id']
+    assert layout['title'] == 'B'
+    assert fig.layout.title == 'B'
+
+
+def test_queued_updates_flushed_before_restyle():
+    fig = make_figure()
+    fig.update_coalesce_interval = 10
+    messages = record_messages(fig)
+
+    async def send_updates():
+        fig.update(style={'opacity': 0.5}, trace_indexes=0)
+        fig.restyle({'name': 'a'}, 1)
+
+    asyncio.run(send_updates())
+
+    assert [name for name, _ in messages] == ['_py2js_update', '_py2js_restyle']
+    assert fig._pending_update is None
+    assert fig._pending_update_handle is None
+
+
+def test_updates_sent_immediately_without_loop():
+    fig = make_figure()
+    fig.update_coalesce_interval = 10
+    messages = record_messages(fig)
+
+    fig.update(style={'opacity': 0.5}, trace_indexes=0)
+
+    assert len(messages) == 1
+    assert messages[0][1][0]['opacity'] == [0.5]
+    assert fig._pending_update is None
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+from ipyplotly.serializers import _py_to_js, _shrink_int_array
+from ipyplotly.datatypes import Figure
+
+
+# Fixtures
+# --------
+@pytest.fixture()
+def fig():
+    return Figure()
+
+
+def to_js_dtype(v, widget_manager):
+    res = _py_to_js(v, widget_manager)
+    return np.frombuffer(res['buffer'], dtype=res['dtype'])
+
+
+# Shrink int arrays
+# -----------------
+@pytest.mark.parametrize('vals,expected_dtype', [
+    ([1, 2, 3], 'int8'),
+    ([-128, 127], 'int8'),
+    ([0, 255], 'uint8'),
+    ([-1, 200], 'int16'),
+    ([0, 70000], 'int32'),
+    ([-70000, 70000], 'int32'),
+    ([0, 2 ** 32 - 1], 'uint32'),
+    ([-1, 2 ** 31], 'int64'),
+])
+def test_shrink_int_array(vals, expected_dtype):
+    v = np.array(vals, dtype='int64')
+
+    res = _shrink_int_array(v)
+    assert res.dtype == expected_dtype
+    assert np.array_equal(res, v)
+
+
+def test_shrink_int_array_empty():
+    v = np.array([], dtype='int64')
+    assert _shrink_int_array(v) is v
+
+
+def test_shrink_int_array_no_smaller_dtype():
+    v = np.array([1, 2], dtype='int8')
+    assert _shrink_int_array(v) is v
+
+
+# Typed array dtypes
+# ------------------
+@pytest.mark.parametrize('v,expected_dtype', [
+    # int64 values that fit a smaller type are sent as that type
+    (np.array([-70000, 70000], dtype='int64'), 'int32'),
+    (np.array([1, 2], dtype='uint64'), 'int8'),
+
+    # Values that don't fit any TypedArray integer type fall back to float64
+    (np.array([2 ** 40, 1], dtype='int64'), 'float64'),
+    (np.array([2 ** 63, 1], dtype='uint64'), 'float64'),
+
+    # Empty int64 arrays can't be shrunk and fall back to float64
+    (np.array([], dtype='int64'), 'float64'),
+
+    # Unsupported float dtypes
+    (np.array([1.5, 2], dtype='float16'), 'float32'),
+    (np.array([1.5, 2], dtype='>f8'), 'float64'),
+])
+def test_typedarray_dtype(v, expected_dtype):
+    res = _py_to_js(v, None)
+
+    assert res['dtype'] == expected_dtype
+    assert res['shape'] == v.shape
+    assert np.array_equal(np.frombuffer(res['buffer'], dtype=res['dtype']), v)
+
+
+def test_non_typedarray_to_list():
+    # Only 1-D numeric arrays are sent as binary buffers
+    assert _py_to_js(np.array([[1, 2], [3, 4]]), None) == [[1, 2], [3, 4]]
+    assert _py_to_js(np.array(['a', 'b'], dtype='object'), None) == ['a', 'b']
+
+
+# float32 arrays
+# --------------
+def test_float64_kept_by_default(fig):
+    v = np.array([1.1, 2.2, 3.3])
+
+    assert fig.float32_arrays is False
+    res = to_js_dtype(v, fig)
+    assert res.dtype == np.float64
+    assert np.array_equal(res, v)
+
+
+def test_float64_to_float32(fig):
+    v = np.array([1.1, 2.2, 3.3])
+
+    fig.float32_arrays = True
+    res = to_js_dtype(v, fig)
+    assert res.dtype == np.float32
+    assert np.allclose(res, v)
+
+
+def test_float32_arrays_invalid(fig):
+    with pytest.raises(ValueError):
+        fig.float32_arrays = 1